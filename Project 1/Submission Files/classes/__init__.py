@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The search infrastructure and the puzzle model live in search_common.py and sliding_puzzle.py at the repository
+# root, two folders above the submission, and are shared with solution_q1.py and solution_q2.py
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
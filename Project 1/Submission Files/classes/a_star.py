@@ -1,5 +1,15 @@
-from collections import deque
-from classes.puzzle import Puzzle
+import heapq
+import itertools
+import math
+from classes.pattern_database import PatternDatabase
+from classes.puzzle import Board, Heuristic, Puzzle, MOVE_DIRECTIONS
+from classes.search_stats import Budget, SearchStats
+
+# Outcomes of one bounded search of IDAStar, returned next to the smallest cost that went over its bound
+FOUND = 0
+CUTOFF = 1
+STOPPED = 2
+
 
 class AStar:
     """
@@ -7,10 +17,22 @@ class AStar:
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
-        self.visited = set()
-        self.queue = deque()
+    def __init__(self, heuristic=None, visited=None, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the AStar object
+        :param heuristic: optional name of a registered Heuristic, or a callable scoring a packed state
+                          such as a PatternDatabase; the puzzle class's heuristic_name is used when it is None
+        :param visited: optional visited structure such as a VisitedBitset, defaults to a set
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.heuristic = heuristic
+        self.visited = set() if visited is None else visited
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def a_star(self, puzzle: Puzzle) -> bool:
         """
@@ -18,24 +40,169 @@ class AStar:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        heuristic = self.heuristic
+        if heuristic is None:
+            heuristic = puzzle.heuristic_name
+        if isinstance(heuristic, str):
+            heuristic = Heuristic.get(heuristic, puzzle.board)
+        if isinstance(heuristic, Heuristic):
+            # Puzzles carry an incremental heuristic already, any other one is scored per child
+            heuristic = None if heuristic.incremental else heuristic.scorer()
+        elif isinstance(heuristic, PatternDatabase):
+            heuristic.check(puzzle.board)
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            # A state can sit in the queue more than once, only its cheapest copy gets expanded
+            if current_puzzle.packed in self.visited:
+                continue
+            self.visited.add(current_puzzle.packed)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves) + x.heuristic))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    if heuristic is None:
+                        priority = new_puzzle.depth + new_puzzle.heuristic
+                    else:
+                        priority = new_puzzle.depth + heuristic(new_puzzle.packed)
+                    heapq.heappush(self.queue, (priority, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        # The counter also numbered the root
+        stats.finish(self.solution, len(self.visited), next(self.counter) - 1)
+        return solved
     
     def get_solution(self) -> list:
         """
         Get the solution path
         :return: list
         """
-        return self.solution
\ No newline at end of file
+        return self.solution
+
+
+class IDAStar:
+    """
+    Iterative Deepening A* Search class, its memory use is linear in the solution depth
+    """
+
+    def __init__(self, heuristic=None, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the IDAStar object
+        :param heuristic: optional name of a registered Heuristic, or a callable scoring a packed state
+                          such as a PatternDatabase; the puzzle class's heuristic_name is used when it is None
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.heuristic = heuristic
+        # The heuristic callable of the running search, None while it is the per move Manhattan delta
+        self.score = None
+        self.path = []
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
+
+    def ida_star(self, puzzle: Puzzle) -> bool:
+        """
+        Function to solve the puzzle with repeated depth first searches bounded by depth + heuristic
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
+        """
+        stats = self.stats
+        stats.start(self.budget)
+        self.path = []
+        self.score = self.heuristic
+        if self.score is None:
+            self.score = puzzle.heuristic_name
+        if isinstance(self.score, str):
+            self.score = Heuristic.get(self.score, puzzle.board)
+        if isinstance(self.score, Heuristic):
+            # Puzzles carry an incremental heuristic already, the search updates it by each move's delta
+            self.score = None if self.score.incremental else self.score.scorer()
+        elif isinstance(self.score, PatternDatabase):
+            self.score.check(puzzle.board)
+        if self.score is None:
+            heuristic = puzzle.heuristic
+        else:
+            heuristic = self.score(puzzle.packed)
+        bound = heuristic
+        outcome = CUTOFF
+        # A search cut off with an infinite next bound had no node left beyond its bound
+        while outcome == CUTOFF and bound != math.inf:
+            outcome, bound = self.__search(puzzle.board, puzzle.packed, puzzle.blank_index, -1, 0, heuristic, bound)
+        stats.lap('search')
+        if outcome == FOUND:
+            self.solution = [f'{tile}{MOVE_DIRECTIONS[move_code]}' for tile, move_code in self.path]
+            stats.lap('path')
+        # Nothing is kept between nodes, the frontier is the recursion path and undo moves are the only rejects
+        stats.finish(self.solution, 0, stats.generated - stats.duplicates)
+        return outcome == FOUND
+
+    def __search(self, board: Board, packed: int, blank_index: int, previous_index: int, depth: int,
+                 heuristic: int, bound: int) -> tuple:
+        """
+        Depth first search below one node, the board travels down as a packed int
+        :param board: Board
+        :param packed: int
+        :param blank_index: int
+        :param previous_index: blank index before the last move, -1 at the root
+        :param depth: int
+        :param heuristic: int, heuristic of this node
+        :param bound: int
+        :return: tuple of FOUND, CUTOFF or STOPPED and the smallest depth + heuristic that went over the bound
+        """
+        if packed == board.goal:
+            return FOUND, bound
+        stats = self.stats
+        stats.expanded += 1
+        if stats.expanded == stats.next_report and stats.report():
+            return STOPPED, bound
+        if depth >= stats.max_frontier:
+            stats.max_frontier = depth + 1
+        next_bound = math.inf
+        moves = board.move_table[blank_index]
+        stats.generated += len(moves)
+        for replacement_index, move_code in moves:
+            if replacement_index == previous_index:
+                stats.duplicates += 1
+                continue  # Never undo the previous move
+            shift = replacement_index * board.bits
+            tile = (packed >> shift) & board.mask
+            child = packed - (tile << shift) + (tile << (blank_index * board.bits))
+            if self.score is None:
+                distances = board.manhattan_table[tile]
+                child_heuristic = heuristic - distances[replacement_index] + distances[blank_index]
+            else:
+                child_heuristic = self.score(child)
+            cost = depth + 1 + child_heuristic
+            if cost > bound:
+                next_bound = min(next_bound, cost)
+                continue
+            self.path.append((tile, move_code))
+            outcome, child_bound = self.__search(board, child, replacement_index, blank_index, depth + 1,
+                                                 child_heuristic, bound)
+            if outcome != CUTOFF:
+                return outcome, child_bound
+            self.path.pop()
+            next_bound = min(next_bound, child_bound)
+        return CUTOFF, next_bound
+
+    def get_solution(self) -> list:
+        """
+        Get the solution path
+        :return: list
+        """
+        return self.solution
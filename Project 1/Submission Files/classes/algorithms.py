@@ -0,0 +1,97 @@
+from classes.a_star import AStar, IDAStar
+from classes.bfs import BFS, BidirectionalBFS, LayerBFS, np
+from classes.dfs import DFS, IDDFS
+from classes.distance_table import DistanceTable
+from classes.pattern_database import PatternDatabase
+from classes.puzzle import Puzzle, SL_Puzzle
+from classes.search_stats import Budget
+from classes.table_solver import TableSolver
+from classes.ucs import UCS
+
+# Algorithms run by run_algorithm, 'pdb' is A* with the PatternDatabase, 'table' reads moves off the DistanceTable
+# and 'layer' is LayerBFS, offered when NumPy is there
+ALGORITHMS = ('dfs', 'iddfs', 'bfs', 'bidirectional', 'ucs', 'astar', 'sl', 'idastar', 'pdb', 'table')
+if np is not None:
+    ALGORITHMS += ('layer',)
+
+# Shared tables by the algorithm reading them and the board width they cover, built once per process
+TABLES = {}
+
+
+def prepare_tables(algorithm: str, table_path: str = None, width: int = 3):
+    """
+    Build or load the shared table an algorithm reads, so its cost is not part of the first solve
+    :param algorithm: str, one of ALGORITHMS
+    :param table_path: str, file caching the PatternDatabase or DistanceTable, built in memory when None
+    :param width: int, width of the boards the table is read for
+    :return: PatternDatabase or DistanceTable, None for algorithms reading no table
+    """
+    if algorithm == 'pdb':
+        key = (algorithm, width)
+        if key not in TABLES:
+            if table_path is None:
+                TABLES[key] = PatternDatabase.build(width)
+            else:
+                TABLES[key] = PatternDatabase.open(table_path, width)
+    elif algorithm == 'table':
+        # A DistanceTable only covers 3x3 boards, TableSolver rejects any other
+        key = (algorithm, 3)
+        if key not in TABLES:
+            TABLES[key] = DistanceTable.build() if table_path is None else DistanceTable.open(table_path)
+    else:
+        return None
+    return TABLES[key]
+
+
+def load_puzzle(puzzle_string: str, algorithm: str = 'astar') -> Puzzle:
+    """
+    Parse a puzzle string into the puzzle class the named algorithm runs on
+    :param puzzle_string: str
+    :param algorithm: str, one of ALGORITHMS
+    :return: Puzzle, or SL_Puzzle for 'sl'
+    """
+    if algorithm == 'sl':
+        return SL_Puzzle(puzzle_string)
+    return Puzzle(puzzle_string)
+
+
+def run_algorithm(puzzle: Puzzle, algorithm: str = 'astar', budget: Budget = None) -> tuple:
+    """
+    Run the named algorithm on a puzzle
+    :param puzzle: Puzzle or SL_Puzzle from load_puzzle
+    :param algorithm: str, one of ALGORITHMS
+    :param budget: optional Budget, the solver's stats tell whether it ran out
+    :return: tuple of (solver, whether it solved the puzzle)
+    """
+    table = prepare_tables(algorithm, width=puzzle.board.width)
+    if algorithm == 'dfs':
+        solver = DFS(budget=budget)
+        solved = solver.dfs(puzzle)
+    elif algorithm == 'iddfs':
+        solver = IDDFS(budget=budget)
+        solved = solver.iddfs(puzzle)
+    elif algorithm == 'bfs':
+        solver = BFS(budget=budget)
+        solved = solver.bfs(puzzle)
+    elif algorithm == 'bidirectional':
+        solver = BidirectionalBFS(budget=budget)
+        solved = solver.bidirectional_bfs(puzzle)
+    elif algorithm == 'layer':
+        solver = LayerBFS(budget=budget)
+        solved = solver.layer_bfs(puzzle)
+    elif algorithm == 'ucs':
+        solver = UCS(budget=budget)
+        solved = solver.ucs(puzzle)
+    elif algorithm == 'idastar':
+        solver = IDAStar(budget=budget)
+        solved = solver.ida_star(puzzle)
+    elif algorithm == 'pdb':
+        solver = AStar(table, budget=budget)
+        solved = solver.a_star(puzzle)
+    elif algorithm == 'table':
+        solver = TableSolver(table, budget=budget)
+        solved = solver.solve(puzzle)
+    else:
+        solver = AStar(budget=budget)
+        solved = solver.a_star(puzzle)
+    return solver, solved
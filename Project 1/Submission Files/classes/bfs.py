@@ -1,15 +1,28 @@
+import math
 from collections import deque
-from classes.puzzle import Puzzle
+from classes.puzzle import Board, Puzzle, MOVE_DIRECTIONS
+from classes.search_stats import Budget, SearchStats
+# LayerBFS is shared with solution_q1.py, np is None when NumPy is missing and LayerBFS cannot run
+from search_common import LayerBFS, np
+
 
 class BFS:
     """
     Breadth First Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
-    def __init__(self):
-        self.visited = set()
+    def __init__(self, visited=None, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the BFS object
+        :param visited: optional visited structure such as a VisitedBitset, defaults to a set
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.visited = set() if visited is None else visited
         self.queue = deque()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def bfs(self, puzzle: Puzzle) -> bool:
         """
@@ -17,23 +30,159 @@ class BFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.queue.append(puzzle)
+        solved = False
         while self.queue:
             current_puzzle = self.queue.popleft()
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
                     self.queue.append(new_puzzle)
-        return False
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
     
     def get_solution(self) -> list:
         """
         Get the solution path
         :return: list
         """
-        return self.solution
\ No newline at end of file
+        return self.solution
+
+
+class BidirectionalBFS:
+    """
+    Bidirectional Breadth First Search class, grows a frontier from the start and one from the goal until they meet
+    """
+
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the BidirectionalBFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        # Both map a packed state to (parent state, blank index, depth), the parent being None at the roots
+        self.forward = {}
+        self.backward = {}
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
+
+    def bidirectional_bfs(self, puzzle: Puzzle) -> bool:
+        """
+        Function to solve the puzzle by alternating breadth first layers from both ends
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
+        """
+        stats = self.stats
+        stats.start(self.budget)
+        board = puzzle.board
+        self.forward = {puzzle.packed: (None, puzzle.blank_index, 0)}
+        self.backward = {board.goal: (None, 0, 0)}
+        solved = puzzle.packed == board.goal
+        meeting = None
+        forward_frontier = [(puzzle.packed, puzzle.blank_index)]
+        backward_frontier = [(board.goal, 0)]
+        while not solved and forward_frontier and backward_frontier:
+            # Grow the smaller frontier by one whole layer
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self.__expand(board, forward_frontier, self.forward, self.backward)
+            else:
+                backward_frontier, meeting = self.__expand(board, backward_frontier, self.backward, self.forward)
+            if len(forward_frontier) + len(backward_frontier) > stats.max_frontier:
+                stats.max_frontier = len(forward_frontier) + len(backward_frontier)
+            if stats.exceeded is not None:
+                # The layer was cut short, so a meeting found in it may not be the best one and is dropped
+                meeting = None
+                break
+            solved = meeting is not None
+        stats.lap('search')
+        if meeting is not None:
+            self.solution = self.__stitch(board, meeting)
+            stats.lap('path')
+        visited = len(self.forward) + len(self.backward)
+        # Both roots are in the visited dicts without having been generated
+        stats.finish(self.solution, visited, visited - 2)
+        return solved
+
+    def __expand(self, board: Board, frontier: list, visited: dict, other: dict) -> tuple:
+        """
+        Expand one layer of a frontier.
+        Every meeting with the other side found in the layer is compared, which keeps the stitched path shortest.
+        :param board: Board
+        :param frontier: list of (packed state, blank index)
+        :param visited: dict of the side being expanded
+        :param other: dict of the opposite side
+        :return: tuple of the next frontier and the best meeting state, None if the sides have not met
+        """
+        next_frontier = []
+        meeting = None
+        best = math.inf
+        stats = self.stats
+        for packed, blank_index in frontier:
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(visited) + len(other)):
+                break
+            depth = visited[packed][2] + 1
+            moves = board.move_table[blank_index]
+            stats.generated += len(moves)
+            for replacement_index, _ in moves:
+                shift = replacement_index * board.bits
+                tile = (packed >> shift) & board.mask
+                child = packed - (tile << shift) + (tile << (blank_index * board.bits))
+                if child in visited:
+                    continue
+                visited[child] = (packed, replacement_index, depth)
+                next_frontier.append((child, replacement_index))
+                if child in other and depth + other[child][2] < best:
+                    best = depth + other[child][2]
+                    meeting = child
+        return next_frontier, meeting
+
+    def __stitch(self, board: Board, meeting: int) -> list:
+        """
+        Join the path from the start to the meeting state with the path from there to the goal
+        :param board: Board
+        :param meeting: int
+        :return: list of moves
+        """
+        states = []
+        packed = meeting
+        while packed is not None:
+            states.append((packed, self.forward[packed][1]))
+            packed = self.forward[packed][0]
+        states.reverse()
+        packed = self.backward[meeting][0]
+        while packed is not None:
+            states.append((packed, self.backward[packed][1]))
+            packed = self.backward[packed][0]
+        moves = []
+        for (_, blank_index), (packed, replacement_index) in zip(states, states[1:]):
+            tile = (packed >> (blank_index * board.bits)) & board.mask
+            move_code = next(code for index, code in board.move_table[blank_index] if index == replacement_index)
+            moves.append(f'{tile}{MOVE_DIRECTIONS[move_code]}')
+        return moves
+
+    def get_solution(self) -> list:
+        """
+        Get the solution path
+        :return: list
+        """
+        return self.solution
@@ -1,15 +1,26 @@
 from collections import deque
 from classes.puzzle import Puzzle
+from classes.search_stats import Budget, SearchStats
+# IDDFS is shared with solution_q1.py, classes.algorithms finds it here next to DFS
+from search_common import IDDFS
 
 class DFS:
     """
     Depth First Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
-    def __init__(self):
-        self.visited = set()
+    def __init__(self, visited=None, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the DFS object
+        :param visited: optional visited structure such as a VisitedBitset, defaults to a set
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.visited = set() if visited is None else visited
         self.stack = deque()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def dfs(self, puzzle: Puzzle) -> bool:
         """
@@ -17,27 +28,41 @@ class DFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.stack.append(puzzle)
+        solved = False
 
         while self.stack:
             current_puzzle = self.stack.pop()
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
+                solved = True
+                break
 
-            for move in current_puzzle.available_moves:
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    if not new_puzzle.is_solved:
-                        self.visited.add(new_puzzle.value)
-                        self.stack.append(new_puzzle)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
+                    self.stack.append(new_puzzle)
+            if len(self.stack) > stats.max_frontier:
+                stats.max_frontier = len(self.stack)
 
-        return False
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
     
     def get_solution(self) -> list:
         """
         Get the solution path
         :return: list
         """
-        return self.solution
\ No newline at end of file
+        return self.solution
@@ -0,0 +1,102 @@
+import mmap
+import os
+from math import factorial
+from classes.puzzle import GOAL_PACKED, MOVE_TABLE
+from classes.ranking import rank_packed
+
+MAGIC = b'DST1'
+
+# Cells of the 3x3 board the table covers, ranks of any other board would index the wrong entries
+SIZE = 9
+
+# Distance stored for states that cannot reach the goal
+UNREACHABLE = 255
+
+
+def build_distances() -> bytearray:
+    """
+    Run a backward breadth first search from '_12345678' over the whole 8-puzzle
+    :return: bytearray of distances indexed by rank_packed
+    """
+    distances = bytearray([UNREACHABLE]) * factorial(SIZE)
+    distances[rank_packed(GOAL_PACKED)] = 0
+    frontier = [(GOAL_PACKED, 0)]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for packed, blank_index in frontier:
+            for replacement_index, _ in MOVE_TABLE[blank_index]:
+                shift = replacement_index << 2
+                tile = (packed >> shift) & 0xF
+                child = packed - (tile << shift) + (tile << (blank_index << 2))
+                rank = rank_packed(child)
+                if distances[rank] == UNREACHABLE:
+                    distances[rank] = distance
+                    next_frontier.append((child, replacement_index))
+        frontier = next_frontier
+    return distances
+
+
+class DistanceTable:
+    """
+    Exact distance to '_12345678' for every 8-puzzle state
+    """
+
+    def __init__(self, distances):
+        """
+        Initialize the DistanceTable object
+        :param distances: bytes-like object indexed by rank_packed
+        """
+        self.distances = distances
+
+    @classmethod
+    def build(cls) -> 'DistanceTable':
+        """
+        Build the table from scratch
+        :return: DistanceTable
+        """
+        return cls(build_distances())
+
+    @classmethod
+    def load(cls, path: str) -> 'DistanceTable':
+        """
+        Load a saved table as a read-only memory map of the file
+        :param path: str
+        :return: DistanceTable
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + factorial(SIZE):
+            raise ValueError(f'{path} is not a distance table')
+        return cls(memoryview(data)[len(MAGIC):])
+
+    @classmethod
+    def open(cls, path: str) -> 'DistanceTable':
+        """
+        Load the table at path, building and saving it first if the file does not exist
+        :param path: str
+        :return: DistanceTable
+        """
+        if not os.path.exists(path):
+            cls.build().save(path)
+        return cls.load(path)
+
+    def save(self, path: str) -> None:
+        """
+        Save the table as a magic prefix followed by the raw distances
+        :param path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(self.distances)
+
+    def __call__(self, packed: int) -> int:
+        """
+        Get the exact distance of a packed state, UNREACHABLE if it cannot be solved
+        :param packed: int
+        :return: int
+        """
+        if packed >> (SIZE << 2):
+            raise ValueError('A DistanceTable only covers 3x3 puzzles')
+        return self.distances[rank_packed(packed)]
@@ -0,0 +1,245 @@
+import mmap
+import os
+import struct
+from classes.puzzle import Board
+
+# Header of a saved database: magic, board width, number of patterns
+HEADER = struct.Struct('<4sBB')
+MAGIC = b'PDB1'
+
+# Disjoint tile groups used when no patterns are given, tile t belongs at index t
+DEFAULT_PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)),
+}
+
+
+def permutation_count(cells: int, length: int) -> int:
+    """
+    Count the ordered picks of length distinct cells out of cells
+    :param cells: int
+    :param length: int
+    :return: int
+    """
+    count = 1
+    for i in range(length):
+        count *= cells - i
+    return count
+
+
+def rank_positions(positions: list, cells: int) -> int:
+    """
+    Rank a list of distinct cell indices among all ordered picks of the same length
+    :param positions: list
+    :param cells: int
+    :return: int
+    """
+    rank = 0
+    for i, position in enumerate(positions):
+        smaller = 0
+        for earlier in positions[:i]:
+            if earlier < position:
+                smaller += 1
+        rank = rank * (cells - i) + position - smaller
+    return rank
+
+
+def unrank_positions(rank: int, length: int, cells: int) -> list:
+    """
+    Inverse of rank_positions
+    :param rank: int
+    :param length: int
+    :param cells: int
+    :return: list
+    """
+    digits = []
+    for i in range(length - 1, -1, -1):
+        rank, digit = divmod(rank, cells - i)
+        digits.append(digit)
+    free = list(range(cells))
+    return [free.pop(digit) for digit in reversed(digits)]
+
+
+def build_neighbours(width: int) -> list:
+    """
+    List the cells adjacent to every cell of a width x width board
+    :param width: int
+    :return: list
+    """
+    neighbours = []
+    for index in range(width * width):
+        i, j = divmod(index, width)
+        cells = []
+        if i < width - 1:
+            cells.append(index + width)
+        if i > 0:
+            cells.append(index - width)
+        if j < width - 1:
+            cells.append(index + 1)
+        if j > 0:
+            cells.append(index - 1)
+        neighbours.append(cells)
+    return neighbours
+
+
+def build_table(width: int, pattern: tuple) -> bytearray:
+    """
+    Run a backward breadth first search from the goal over the abstract states of one pattern.
+    An abstract state is the cells of the pattern tiles plus the blank; only moves of pattern
+    tiles are counted, which is what makes disjoint tables additive.
+    :param width: int
+    :param pattern: tuple of tiles
+    :return: bytearray of distances indexed by rank_positions of the pattern tile cells
+    """
+    cells = width * width
+    length = len(pattern)
+    neighbours = build_neighbours(width)
+    table = bytearray(b'\xff') * permutation_count(cells, length)
+    closed = bytearray(len(table) * cells)
+    # Codes are rank * cells + blank, starting from the goal with the blank at index 0
+    frontier = [rank_positions(list(pattern), cells) * cells]
+    cost = 0
+    while frontier:
+        next_frontier = []
+        stack = frontier
+        while stack:
+            code = stack.pop()
+            if closed[code]:
+                continue
+            closed[code] = 1
+            rank, blank = divmod(code, cells)
+            if cost < table[rank]:
+                table[rank] = cost
+            positions = unrank_positions(rank, length, cells)
+            for cell in neighbours[blank]:
+                if cell in positions:
+                    # A pattern tile slides into the blank, which costs one move
+                    moved = positions[:]
+                    moved[positions.index(cell)] = blank
+                    child = rank_positions(moved, cells) * cells + cell
+                    if not closed[child]:
+                        next_frontier.append(child)
+                else:
+                    # Moving a tile outside the pattern is free
+                    child = rank * cells + cell
+                    if not closed[child]:
+                        stack.append(child)
+        frontier = next_frontier
+        cost += 1
+    return table
+
+
+class PatternDatabase:
+    """
+    Additive disjoint pattern database heuristic for the sliding tile puzzle
+    """
+
+    def __init__(self, width: int, patterns: tuple, tables: list):
+        """
+        Initialize the PatternDatabase object
+        :param width: int
+        :param patterns: tuple of disjoint tile tuples
+        :param tables: list of distance tables, one per pattern
+        """
+        self.width = width
+        self.patterns = patterns
+        self.tables = tables
+        board = Board.get(width)
+        self.cells = board.size
+        self.bits = board.bits
+        self.mask = board.mask
+
+    @classmethod
+    def build(cls, width: int = 3, patterns: tuple = None) -> 'PatternDatabase':
+        """
+        Build every pattern table from scratch
+        :param width: int
+        :param patterns: tuple of disjoint tile tuples
+        :return: PatternDatabase
+        """
+        if patterns is None:
+            if width not in DEFAULT_PATTERNS:
+                raise ValueError(f'No default patterns for {width}x{width} puzzles')
+            patterns = DEFAULT_PATTERNS[width]
+        return cls(width, patterns, [build_table(width, pattern) for pattern in patterns])
+
+    @classmethod
+    def load(cls, path: str) -> 'PatternDatabase':
+        """
+        Load a saved database; the tables are read-only views over a memory map of the file,
+        so every process loading the same file shares its pages
+        :param path: str
+        :return: PatternDatabase
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a pattern database')
+        offset = HEADER.size
+        patterns = []
+        for _ in range(count):
+            length = data[offset]
+            patterns.append(tuple(data[offset + 1:offset + 1 + length]))
+            offset += 1 + length
+        tables = []
+        view = memoryview(data)
+        for pattern in patterns:
+            size = permutation_count(width * width, len(pattern))
+            tables.append(view[offset:offset + size])
+            offset += size
+        return cls(width, tuple(patterns), tables)
+
+    @classmethod
+    def open(cls, path: str, width: int = 3, patterns: tuple = None) -> 'PatternDatabase':
+        """
+        Load the database at path, building and saving it first if the file does not exist
+        :param path: str
+        :param width: int
+        :param patterns: tuple of disjoint tile tuples
+        :return: PatternDatabase
+        """
+        if not os.path.exists(path):
+            cls.build(width, patterns).save(path)
+        database = cls.load(path)
+        if database.width != width or (patterns is not None and database.patterns != tuple(patterns)):
+            raise ValueError(f'{path} does not hold a {width}x{width} database of these patterns')
+        return database
+
+    def save(self, path: str) -> None:
+        """
+        Save the database as a header, the patterns and the raw distance tables
+        :param path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.width, len(self.patterns)))
+            for pattern in self.patterns:
+                f.write(bytes([len(pattern), *pattern]))
+            for table in self.tables:
+                f.write(table)
+
+    def check(self, board: Board) -> None:
+        """
+        Make sure the database covers the board a search is about to score, __call__ does not look
+        :param board: Board
+        """
+        if board.width != self.width:
+            raise ValueError(f'A {self.width}x{self.width} PatternDatabase cannot score {board.width}x{board.width} '
+                             f'puzzles')
+
+    def __call__(self, packed: int) -> int:
+        """
+        Sum the pattern distances of a packed state of the database's width
+        :param packed: int
+        :return: int
+        """
+        cells = self.cells
+        bits = self.bits
+        mask = self.mask
+        positions = [0] * cells
+        for index in range(cells):
+            positions[(packed >> (index * bits)) & mask] = index
+        distance = 0
+        for pattern, table in zip(self.patterns, self.tables):
+            distance += table[rank_positions([positions[tile] for tile in pattern], cells)]
+        return distance
@@ -0,0 +1,123 @@
+from math import factorial
+
+FACTORIALS = [factorial(i) for i in range(17)]
+
+# Packed states hold a tile in every 4 bits, which fits boards of up to 4x4 cells
+MAX_PACKED_SIZE = 16
+# Cells of the largest board whose permutations a VisitedBitset can hold, 3x3 takes 45 KB and 4x4 would take 2.6 TB
+MAX_BITSET_SIZE = 9
+
+
+def rank_permutation(tiles: list) -> int:
+    """
+    Rank a permutation of 0..n-1 by its Lehmer code, giving a dense index in 0..n!-1
+    :param tiles: list
+    :return: int
+    """
+    size = len(tiles)
+    rank = 0
+    seen = 0
+    for i, tile in enumerate(tiles):
+        # Tiles smaller than this one that are still to the right of it
+        smaller = tile - bin(seen & ((1 << tile) - 1)).count('1')
+        rank += smaller * FACTORIALS[size - 1 - i]
+        seen |= 1 << tile
+    return rank
+
+
+def unrank_permutation(rank: int, size: int) -> list:
+    """
+    Inverse of rank_permutation
+    :param rank: int
+    :param size: int
+    :return: list
+    """
+    free = list(range(size))
+    tiles = []
+    for i in range(size - 1, -1, -1):
+        digit, rank = divmod(rank, FACTORIALS[i])
+        tiles.append(free.pop(digit))
+    return tiles
+
+
+def rank_packed(packed: int, size: int = 9) -> int:
+    """
+    Rank a packed puzzle state, the blank counting as tile 0, ValueError if it is not a board of size cells
+    :param packed: int
+    :param size: int
+    :return: int
+    """
+    if size > MAX_PACKED_SIZE:
+        raise ValueError(f'Packed states of {size} cells do not fit 4 bits per tile, at most {MAX_PACKED_SIZE} cells')
+    if packed >> (size << 2):
+        raise ValueError(f'The packed state has tiles past the last of {size} cells')
+    rank = 0
+    seen = 0
+    for index in range(size):
+        tile = (packed >> (index << 2)) & 0xF
+        rank += (tile - bin(seen & ((1 << tile) - 1)).count('1')) * FACTORIALS[size - 1 - index]
+        seen |= 1 << tile
+    # A state of a smaller board repeats the blank, one of a larger board has tiles past size - 1
+    if seen != (1 << size) - 1:
+        raise ValueError(f'The packed state is not a board of {size} cells')
+    return rank
+
+
+def unrank_packed(rank: int, size: int = 9) -> int:
+    """
+    Inverse of rank_packed
+    :param rank: int
+    :param size: int
+    :return: int
+    """
+    if size > MAX_PACKED_SIZE:
+        raise ValueError(f'Packed states of {size} cells do not fit 4 bits per tile, at most {MAX_PACKED_SIZE} cells')
+    packed = 0
+    for index, tile in enumerate(unrank_permutation(rank, size)):
+        packed |= tile << (index << 2)
+    return packed
+
+
+class VisitedBitset:
+    """
+    Visited set of packed states backed by one bit per permutation rank, 45 KB for the 8-puzzle.
+    States of a board with another number of cells are rejected with a ValueError.
+    """
+
+    def __init__(self, size: int = 9) -> None:
+        """
+        Initialize the VisitedBitset object
+        :param size: number of cells on the board
+        """
+        if size > MAX_BITSET_SIZE:
+            raise ValueError(f'A VisitedBitset of {size} cells is too large, at most {MAX_BITSET_SIZE} cells')
+        self.size = size
+        self.bits = bytearray((FACTORIALS[size] + 7) >> 3)
+        self.count = 0
+
+    def add(self, packed: int) -> None:
+        """
+        Mark a packed state as visited
+        :param packed: int
+        """
+        rank = rank_packed(packed, self.size)
+        mask = 1 << (rank & 7)
+        if not self.bits[rank >> 3] & mask:
+            self.bits[rank >> 3] |= mask
+            self.count += 1
+
+    def __contains__(self, packed: int) -> bool:
+        """
+        Check if a packed state was visited
+        :param packed: int
+        :return: bool
+        """
+        rank = rank_packed(packed, self.size)
+        return bool(self.bits[rank >> 3] & (1 << (rank & 7)))
+
+    def __len__(self) -> int:
+        """
+        Number of visited states
+        :return: int
+        """
+        return self.count
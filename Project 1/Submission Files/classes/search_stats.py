@@ -0,0 +1,2 @@
+# Budget and SearchStats are shared with solution_q1.py and solution_q2.py, the classes modules import them from here
+from search_common import Budget, SearchStats
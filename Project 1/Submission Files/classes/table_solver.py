@@ -0,0 +1,60 @@
+from classes.distance_table import DistanceTable, SIZE, UNREACHABLE
+from classes.puzzle import Puzzle
+from classes.search_stats import Budget, SearchStats
+
+class TableSolver:
+    """
+    Solver that reads optimal moves off a complete DistanceTable instead of searching
+    """
+
+    def __init__(self, table: DistanceTable, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the TableSolver object
+        :param table: DistanceTable
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.table = table
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
+
+    def solve(self, puzzle: Puzzle) -> bool:
+        """
+        Greedily step to any neighbour one move closer to the goal until the goal is reached
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
+        """
+        if puzzle.board.size != SIZE:
+            width = puzzle.board.width
+            raise ValueError(f'A DistanceTable only covers 3x3 puzzles, not {width}x{width}')
+        stats = self.stats
+        stats.start(self.budget)
+        distance = self.table(puzzle.packed)
+        solved = distance != UNREACHABLE
+        current_puzzle = puzzle
+        while solved and distance:
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report():
+                solved = False
+                break
+            for move in current_puzzle.available_moves:
+                stats.generated += 1
+                new_puzzle = current_puzzle.execute_move(move)
+                if self.table(new_puzzle.packed) == distance - 1:
+                    break
+            current_puzzle = new_puzzle
+            distance -= 1
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+        # Only the step taken at each depth counts as pushed, the children looked at before it were rejected
+        stats.finish(self.solution, 0, current_puzzle.depth)
+        return solved
+
+    def get_solution(self) -> list:
+        """
+        Get the solution path
+        :return: list
+        """
+        return self.solution
@@ -1,5 +1,7 @@
-from collections import deque
+import heapq
+import itertools
 from classes.puzzle import Puzzle
+from classes.search_stats import Budget, SearchStats
 
 class UCS:
     """
@@ -7,10 +9,19 @@ class UCS:
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
-        self.visited = set()
-        self.queue = deque()
+    def __init__(self, visited=None, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the UCS object
+        :param visited: optional visited structure such as a VisitedBitset, defaults to a set
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.visited = set() if visited is None else visited
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
     
     def ucs(self, puzzle: Puzzle) -> bool:
         """
@@ -18,20 +29,34 @@ class UCS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves)))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
+                    heapq.heappush(self.queue, (new_puzzle.depth, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
     
     def get_solution(self) -> list:
         """
@@ -0,0 +1,239 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import solution_q1
+import solution_q2
+
+
+def load_classes():
+    """
+    Import the algorithms module of the submission's classes package, which its scripts import as `classes`
+    from their own folder. That folder is on the import path only while the package loads.
+    :return: module
+    """
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project 1', 'Submission Files')
+    sys.path.insert(0, folder)
+    try:
+        return importlib.import_module('classes.algorithms')
+    finally:
+        sys.path.remove(folder)
+
+
+# Goal definitions covered: the module solving them, the optimal algorithm used to measure
+# the depth of corpus boards and the depths benchmarked by default. 'classes' is the Q1 goal
+# solved by the classes package, which adds IDA*, bidirectional BFS, the pattern database and the distance table.
+# Its module is filled in by question_module the first time the goal is run.
+QUESTIONS = {
+    'q1': {'module': solution_q1, 'oracle': 'astar', 'depths': (4, 8, 12, 16, 20)},
+    'q2': {'module': solution_q2, 'oracle': 'toprow', 'depths': (1, 3, 5, 7)},
+    'classes': {'module': None, 'oracle': 'astar', 'depths': (4, 8, 12, 16, 20)},
+}
+
+# Columns of the summary table, averaged over the boards of one depth
+COLUMNS = ('length', 'expanded', 'generated', 'duplicates', 'max_frontier', 'max_visited', 'seconds', 'peak_kib')
+
+
+def question_module(question: str):
+    """
+    Get the module solving a goal, the classes package is only imported once its goal is asked for
+    :param question: str, key of QUESTIONS
+    :return: module
+    """
+    entry = QUESTIONS[question]
+    if entry['module'] is None:
+        entry['module'] = load_classes()
+    return entry['module']
+
+
+def build_corpus(question: str, depths: tuple, per_depth: int, seed: int = 0) -> list:
+    """
+    Collect solvable boards of each optimal depth by random walks from '_12345678',
+    the same seed always gives the same corpus
+    :param question: str, key of QUESTIONS
+    :param depths: tuple of int
+    :param per_depth: int, boards wanted for each depth
+    :param seed: int
+    :return: list of (depth, board string) sorted by depth
+    """
+    module = question_module(question)
+    oracle = QUESTIONS[question]['oracle']
+    rng = random.Random(seed)
+    wanted = {depth: [] for depth in depths}
+    attempts = 0
+    while any(len(boards) < per_depth for boards in wanted.values()):
+        attempts += 1
+        if attempts > 10000 * per_depth:
+            missing = [depth for depth, boards in wanted.items() if len(boards) < per_depth]
+            raise ValueError(f'No {question} boards found for depths {missing}')
+        puzzle = module.Puzzle('_12345678')
+        for _ in range(rng.randint(0, 2 * max(depths) + 10)):
+            puzzle = puzzle.execute_move(rng.choice(puzzle.available_moves))
+        board = puzzle.value
+        solver, _ = module.run_algorithm(module.load_puzzle(board, oracle), oracle)
+        boards = wanted.get(len(solver.get_solution()))
+        if boards is not None and len(boards) < per_depth and board not in boards:
+            boards.append(board)
+    return [(depth, board) for depth in sorted(wanted) for board in wanted[depth]]
+
+
+def run_once(module, board: str, algorithm: str, memory: bool, budget=None) -> dict:
+    """
+    Solve one board and measure the run. Peak memory comes from a second run under tracemalloc,
+    which would otherwise slow down the timed one.
+    :param module: module of a QUESTIONS entry
+    :param board: str
+    :param algorithm: str
+    :param memory: bool, measure peak memory
+    :param budget: optional module.Budget of the timed run, a run that exceeds it counts as unsolved
+    :return: dict
+    """
+    puzzle = module.load_puzzle(board, algorithm)
+    start = time.perf_counter()
+    solver, solved = module.run_algorithm(puzzle, algorithm, budget)
+    seconds = time.perf_counter() - start
+    # Runs that gave up have no length, so they do not drag the average down
+    length = len(solver.get_solution()) if solved else None
+    record = {'solved': solved, 'length': length, 'seconds': seconds, 'peak_kib': None}
+    record.update(solver.stats.as_dict())
+    if memory:
+        puzzle = module.load_puzzle(board, algorithm)
+        # Tracing slows the search down, so instead of the time budget the traced run gets a node budget
+        # that lets it repeat exactly the expansions of the timed run
+        traced_budget = module.Budget(max_expanded=solver.stats.expanded)
+        tracemalloc.start()
+        module.run_algorithm(puzzle, algorithm, traced_budget)
+        record['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return record
+
+
+def run_benchmark(question: str, corpus: list, algorithms: tuple, memory: bool = True,
+                  table_path: str = None, seconds: float = None, max_expanded: int = None,
+                  tables_folder: str = None) -> list:
+    """
+    Run every algorithm over every board of a corpus
+    :param question: str, key of QUESTIONS
+    :param corpus: list from build_corpus
+    :param algorithms: tuple of algorithm names
+    :param memory: bool, measure peak memory
+    :param table_path: str, file caching the Q2 GoalDistanceTable
+    :param seconds: float, time each run may take before it gives up
+    :param max_expanded: int, nodes each run may expand before it gives up
+    :param tables_folder: str, folder caching the pattern database and distance table of the classes package
+    :return: list of dict, one per run
+    """
+    module = question_module(question)
+    budget = None
+    if seconds is not None or max_expanded is not None:
+        budget = module.Budget(seconds, max_expanded)
+    records = []
+    for algorithm in algorithms:
+        # Shared tables are built up front so their cost is not timed as part of the first board
+        if question == 'q2':
+            solution_q2.prepare_tables(algorithm, table_path)
+        elif question == 'classes':
+            path = None if tables_folder is None else os.path.join(tables_folder, f'{algorithm}.bin')
+            module.prepare_tables(algorithm, path)
+        for depth, board in corpus:
+            record = {'goal': question, 'algorithm': algorithm, 'board': board}
+            record.update(run_once(module, board, algorithm, memory, budget))
+            # The stats depth of a run is its solution length, here depth is the optimal one the board was picked for
+            record['depth'] = depth
+            records.append(record)
+    return records
+
+
+def summarize(records: list) -> list:
+    """
+    Average the runs of each goal, algorithm and depth
+    :param records: list from run_benchmark
+    :return: list of dict
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault((record['goal'], record['algorithm'], record['depth']), []).append(record)
+    summary = []
+    for (goal, algorithm, depth), runs in groups.items():
+        row = {'goal': goal, 'algorithm': algorithm, 'depth': depth, 'boards': len(runs),
+               'solved': sum(run['solved'] for run in runs)}
+        for column in COLUMNS:
+            values = [run[column] for run in runs if run[column] is not None]
+            row[column] = sum(values) / len(values) if values else None
+        summary.append(row)
+    return summary
+
+
+def format_table(summary: list) -> str:
+    """
+    Lay out a summary as a fixed width text table
+    :param summary: list from summarize
+    :return: str
+    """
+    header = ('goal', 'algorithm', 'depth', 'solved') + COLUMNS
+    rows = [header]
+    for row in summary:
+        cells = [row['goal'], row['algorithm'], str(row['depth']), f"{row['solved']}/{row['boards']}"]
+        for column in COLUMNS:
+            value = row[column]
+            if value is None:
+                cells.append('-')
+            elif column == 'seconds':
+                cells.append(f'{value:.4f}')
+            else:
+                cells.append(f'{value:.1f}')
+        rows.append(tuple(cells))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join('  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--goals', nargs='+', choices=QUESTIONS, default=list(QUESTIONS),
+                        help='goal definitions to benchmark')
+    parser.add_argument('--algorithms', nargs='+',
+                        help='algorithms to run, every algorithm of each goal by default')
+    parser.add_argument('--depths', nargs='+', type=int,
+                        help='optimal depths of the corpus boards, a default per goal when left out')
+    parser.add_argument('--per-depth', type=int, default=3,
+                        help='boards per depth')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the corpus')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the second, traced run that measures peak memory')
+    parser.add_argument('--table', metavar='PATH',
+                        help='file caching the Q2 goal distance table')
+    parser.add_argument('--tables', metavar='FOLDER',
+                        help='folder caching the pattern database and distance table of the classes package')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='give up on a run after SECONDS, it then counts as unsolved')
+    parser.add_argument('--max-expanded', type=int, metavar='N',
+                        help='give up on a run after expanding N nodes, it then counts as unsolved')
+    parser.add_argument('--json', metavar='PATH',
+                        help="also write every run and the summary as JSON to PATH, '-' for stdout")
+    args = parser.parse_args()
+
+    records = []
+    for question in args.goals:
+        module = question_module(question)
+        algorithms = [algorithm for algorithm in args.algorithms or module.ALGORITHMS
+                      if algorithm in module.ALGORITHMS]
+        depths = tuple(args.depths or QUESTIONS[question]['depths'])
+        corpus = build_corpus(question, depths, args.per_depth, args.seed)
+        records.extend(run_benchmark(question, corpus, algorithms, not args.no_memory, args.table,
+                                     args.timeout, args.max_expanded, args.tables))
+    summary = summarize(records)
+
+    # The table moves to stderr when stdout carries the JSON
+    print(format_table(summary), file=sys.stderr if args.json == '-' else sys.stdout)
+    if args.json:
+        report = {'settings': vars(args), 'runs': records, 'summary': summary}
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,627 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import sqlite3
+import time
+from collections import OrderedDict, deque
+
+# NumPy is optional, only LayerBFS needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Direction the moved tile travels in, indexed by move code
+MOVE_DIRECTIONS = 'UDLR'
+
+
+class Budget:
+    """
+    Limits on one search. A solver checks them every `check_every` expansions, at the same
+    int comparison that schedules the SearchStats callback, and stops once one runs out.
+    """
+
+    def __init__(self, seconds: float = None, max_expanded: int = None, max_visited: int = None, token=None,
+                 check_every: int = 1024):
+        """
+        Initialize the Budget object
+        :param seconds: float, wall-clock time the search may take
+        :param max_expanded: int, nodes the search may expand, enforced exactly
+        :param max_visited: int, states the visited structure may hold, overshot by at most one expansion
+        :param token: optional cancellation token such as a threading.Event or multiprocessing.Event,
+                      the search stops once it is set
+        :param check_every: int, expansions between two checks of the time, visited size and token
+        """
+        self.seconds = seconds
+        self.max_expanded = max_expanded
+        self.max_visited = max_visited
+        self.token = token
+        self.check_every = check_every
+
+    def next_check(self, expanded: int, visited: int) -> int:
+        """
+        Get the expansion count of the check following the one at expanded
+        :param expanded: int
+        :param visited: int, size of the visited structure at expanded
+        :return: int
+        """
+        at = expanded + self.check_every
+        if self.max_expanded is not None:
+            # The expansion past the limit is caught before its children are generated
+            at = min(at, self.max_expanded + 1)
+        if self.max_visited is not None:
+            # An expansion adds at most 4 states, so no check is skipped that could find the limit passed
+            at = min(at, expanded + max(1, (self.max_visited - visited) // 4))
+        return at
+
+    def exceeded(self, stats: 'SearchStats', visited: int) -> str:
+        """
+        Find the limit a search has run out of
+        :param stats: SearchStats of the search
+        :param visited: int, size of its visited structure
+        :return: str, one of 'cancelled', 'seconds', 'expanded' and 'visited', None while within budget
+        """
+        if self.token is not None and self.token.is_set():
+            return 'cancelled'
+        if self.seconds is not None and time.perf_counter() - stats.started > self.seconds:
+            return 'seconds'
+        if self.max_expanded is not None and stats.expanded > self.max_expanded:
+            return 'expanded'
+        if self.max_visited is not None and visited > self.max_visited:
+            return 'visited'
+        return None
+
+
+class SearchStats:
+    """
+    Counters a solver fills in while it searches. The callback and the Budget are optional and
+    a solver only compares one int per expansion to find out whether either is due.
+    """
+
+    def __init__(self, callback=None, every: int = 0):
+        """
+        Initialize the SearchStats object
+        :param callback: optional callable taking this SearchStats, fired every `every` expansions
+        :param every: int
+        """
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.max_frontier = 0
+        self.max_visited = 0
+        self.depth = 0
+        self.phases = {}
+        self.callback = callback
+        self.every = every
+        self.budget = None
+        # Name of the Budget limit that stopped the search, None when it ran to the end
+        self.exceeded = None
+        # Expansion counts of the next callback and the next Budget check, -1 when there is none
+        self.next_callback = every if callback is not None and every > 0 else -1
+        self.next_check = -1
+        # The smaller of the two, the only one a solver looks at
+        self.next_report = self.next_callback
+        self.started = 0.0
+        self.clock = 0.0
+
+    def start(self, budget: Budget = None) -> None:
+        """
+        Start timing the first phase and the budget
+        :param budget: optional Budget
+        """
+        self.budget = budget
+        if budget is not None:
+            self.next_check = budget.next_check(self.expanded, 0)
+            self.__schedule()
+        self.started = self.clock = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        Add the time since the last start or lap to a phase
+        :param phase: str
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.clock
+        self.clock = now
+
+    def report(self, visited: int = 0) -> bool:
+        """
+        Fire the callback and check the budget, whichever is due, then schedule the next report.
+        A solver counting a whole layer of expansions at once may have gone past either.
+        :param visited: int, size of the visited structure
+        :return: bool, True when the budget ran out and the search has to stop
+        """
+        if 0 < self.next_callback <= self.expanded:
+            self.callback(self)
+            while self.next_callback <= self.expanded:
+                self.next_callback += self.every
+        if 0 < self.next_check <= self.expanded:
+            self.next_check = self.budget.next_check(self.expanded, visited)
+            self.exceeded = self.budget.exceeded(self, visited)
+            if self.exceeded is not None:
+                # The node just counted is left unexpanded
+                self.expanded -= 1
+        self.__schedule()
+        return self.exceeded is not None
+
+    def finish(self, solution: list, visited: int, pushed: int) -> None:
+        """
+        Fill in the totals known once the search is over
+        :param solution: list of moves
+        :param visited: int, size of the visited structure
+        :param pushed: int, generated children that were added to the frontier
+        """
+        self.depth = len(solution)
+        self.max_visited = max(self.max_visited, visited)
+        self.duplicates = self.generated - pushed
+
+    def as_dict(self) -> dict:
+        """
+        Get the counters as a plain dict
+        :return: dict
+        """
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'max_frontier': self.max_frontier,
+            'max_visited': self.max_visited,
+            'depth': self.depth,
+            'exceeded': self.exceeded,
+            'phases': dict(self.phases),
+        }
+
+    # ---- Helper Functions ----
+    def __schedule(self) -> None:
+        """
+        Point next_report at the nearer of the next callback and the next Budget check
+        """
+        pending = [at for at in (self.next_callback, self.next_check) if at > 0]
+        self.next_report = min(pending) if pending else -1
+
+
+# Outcomes of one depth limited search of IDDFS
+FOUND = 0
+CUTOFF = 1
+EXHAUSTED = 2
+STOPPED = 3
+
+
+class IDDFS:
+    """
+    Iterative Deepening Depth First Search class, repeats a depth limited search with a growing limit.
+    Only the states on the current path are kept, so memory stays linear in the depth,
+    and the first solution found is a shortest one. The puzzle's board supplies the moves and the goal test.
+    """
+
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the IDDFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.path = []
+        self.on_path = set()
+        self.is_goal = None
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
+
+    def iddfs(self, puzzle) -> bool:
+        """
+        Function to solve the puzzle with depth limited searches of limit 0, 1, 2, ...
+        until one reaches the goal or none is cut off by its limit
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
+        """
+        stats = self.stats
+        stats.start(self.budget)
+        self.is_goal = puzzle.board.is_goal
+        self.path = []
+        self.on_path = {puzzle.packed}
+        limit = 0
+        outcome = CUTOFF
+        while outcome == CUTOFF:
+            outcome = self.__search(puzzle.board, puzzle.packed, puzzle.blank_index, limit)
+            limit += 1
+        stats.lap('search')
+        if outcome == FOUND:
+            self.solution = [f'{tile}{MOVE_DIRECTIONS[move_code]}' for tile, move_code in self.path]
+            stats.lap('path')
+        # The path is the frontier and the visited set at once, cycles closed on it are the only rejects
+        stats.finish(self.solution, stats.max_frontier, stats.generated - stats.duplicates)
+        return outcome == FOUND
+
+    def __search(self, board, packed: int, blank_index: int, limit: int) -> int:
+        """
+        Depth limited search below one node, the board travels down as a packed int
+        :param board: Board
+        :param packed: int
+        :param blank_index: int
+        :param limit: int, moves left before the search is cut off
+        :return: int, FOUND, CUTOFF, EXHAUSTED or STOPPED
+        """
+        if limit == 0:
+            # A goal nearer the start was reached by an earlier, smaller limit, so only nodes at the limit are tested
+            return FOUND if self.is_goal(packed) else CUTOFF
+        stats = self.stats
+        stats.expanded += 1
+        if stats.expanded == stats.next_report and stats.report(len(self.on_path)):
+            return STOPPED
+        if len(self.on_path) > stats.max_frontier:
+            stats.max_frontier = len(self.on_path)
+        moves = board.move_table[blank_index]
+        stats.generated += len(moves)
+        outcome = EXHAUSTED
+        for replacement_index, move_code in moves:
+            shift = replacement_index * board.bits
+            tile = (packed >> shift) & board.mask
+            child = packed - (tile << shift) + (tile << (blank_index * board.bits))
+            if child in self.on_path:
+                # Only the current path is checked, a state reached again by another path is searched again
+                stats.duplicates += 1
+                continue
+            self.on_path.add(child)
+            self.path.append((tile, move_code))
+            child_outcome = self.__search(board, child, replacement_index, limit - 1)
+            if child_outcome == FOUND or child_outcome == STOPPED:
+                return child_outcome
+            self.path.pop()
+            self.on_path.discard(child)
+            if child_outcome == CUTOFF:
+                outcome = CUTOFF
+        return outcome
+
+    def get_solution(self) -> list:
+        """
+        Get the solution path
+        :return: list
+        """
+        return self.solution
+
+
+class LayerBFS:
+    """
+    Layer synchronous Breadth First Search over NumPy arrays of packed states. Each depth layer is a sorted
+    uint64 array expanded at once with vectorized shifts and masks, next to a uint8 array of the move code
+    that reached each state, which is all the walk back to the start needs. The puzzle's board supplies the
+    geometry and finds the goal in a layer.
+    """
+
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the LayerBFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, checked between layers
+        """
+        if np is None:
+            raise ImportError('LayerBFS needs numpy')
+        self.layers = []
+        self.codes = []
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
+
+    def layer_bfs(self, puzzle) -> bool:
+        """
+        Function to solve the puzzle one whole depth layer at a time
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
+        """
+        board = puzzle.board
+        if board.size * board.bits > 64:
+            raise ValueError('LayerBFS packs states into 64 bits, the board is too large')
+        stats = self.stats
+        stats.start(self.budget)
+        # Replacement index of every move code and blank index, -1 where the move is not legal
+        replacements = np.full((4, board.size), -1, dtype=np.int64)
+        for blank_index, moves in enumerate(board.move_table):
+            for replacement_index, move_code in moves:
+                replacements[move_code, blank_index] = replacement_index
+        frontier = np.array([puzzle.packed], dtype=np.uint64)
+        self.layers = [frontier]
+        self.codes = [np.zeros(1, dtype=np.uint8)]
+        previous = np.empty(0, dtype=np.uint64)
+        visited = 1
+        found = board.find_goal(frontier)
+        while found < 0 and len(frontier):
+            before = stats.expanded
+            stats.expanded += len(frontier)
+            if 0 < stats.next_report <= stats.expanded and stats.report(visited):
+                # The layer is left unexpanded
+                stats.expanded = before
+                break
+            children, codes = self.__expand(board, frontier, replacements)
+            stats.generated += len(children)
+            children, first = np.unique(children, return_index=True)
+            codes = codes[first]
+            # A move takes the blank to a cell of the other colour of a checkerboard, so every neighbour of a layer
+            # lies in the layer before or after it, and the previous layer is all a new one is deduped against
+            if len(previous):
+                positions = np.minimum(np.searchsorted(previous, children), len(previous) - 1)
+                fresh = previous[positions] != children
+                children = children[fresh]
+                codes = codes[fresh]
+            previous, frontier = frontier, children
+            self.layers.append(frontier)
+            self.codes.append(codes)
+            visited += len(frontier)
+            if len(frontier) > stats.max_frontier:
+                stats.max_frontier = len(frontier)
+            found = board.find_goal(frontier)
+        stats.lap('search')
+        if found >= 0:
+            self.solution = self.__walk_back(board, int(frontier[found]))
+            stats.lap('path')
+        # Every layer is kept for the walk back, so all of them count as visited
+        stats.finish(self.solution, visited, visited - 1)
+        return found >= 0
+
+    # ---- Helper Functions ----
+    def __expand(self, board, layer, replacements) -> tuple:
+        """
+        Generate the children of every state of a layer, one move code at a time
+        :param board: Board
+        :param layer: uint64 array
+        :param replacements: int64 array of replacement indices by [move code][blank index]
+        :return: tuple of the uint64 children and the uint8 move code of each
+        """
+        bits = np.uint64(board.bits)
+        shifts = np.arange(board.size, dtype=np.uint64) * bits
+        tiles = (layer[:, None] >> shifts) & np.uint64(board.mask)
+        # The blank is the only 0 tile
+        blanks = np.argmin(tiles, axis=1)
+        children = []
+        codes = []
+        for move_code in range(4):
+            replacement_indices = replacements[move_code][blanks]
+            legal = np.flatnonzero(replacement_indices >= 0)
+            replacement_indices = replacement_indices[legal]
+            tile = tiles[legal, replacement_indices]
+            old_shift = replacement_indices.astype(np.uint64) * bits
+            new_shift = blanks[legal].astype(np.uint64) * bits
+            children.append(layer[legal] - (tile << old_shift) + (tile << new_shift))
+            codes.append(np.full(len(legal), move_code, dtype=np.uint8))
+        return np.concatenate(children), np.concatenate(codes)
+
+    def __walk_back(self, board, packed: int) -> list:
+        """
+        Follow the stored move codes from a goal state back to the start, undoing one move per layer
+        :param board: Board
+        :param packed: int, goal state in the last layer
+        :return: list of moves
+        """
+        # A move code's tile came from the blank index plus this offset
+        offsets = (board.width, -board.width, 1, -1)
+        moves = []
+        for depth in range(len(self.layers) - 1, 0, -1):
+            layer = self.layers[depth]
+            move_code = int(self.codes[depth][np.searchsorted(layer, np.uint64(packed))])
+            replacement_index = 0
+            while (packed >> (replacement_index * board.bits)) & board.mask:
+                replacement_index += 1
+            blank_index = replacement_index - offsets[move_code]
+            tile = (packed >> (blank_index * board.bits)) & board.mask
+            moves.append(f'{tile}{MOVE_DIRECTIONS[move_code]}')
+            packed = packed - (tile << (blank_index * board.bits)) + (tile << (replacement_index * board.bits))
+        moves.reverse()
+        return moves
+
+    def get_solution(self) -> list:
+        """
+        Get the solution path
+        :return: list
+        """
+        return self.solution
+
+
+class SolutionCache:
+    """
+    Solutions keyed by (state, goal, algorithm), held in a bounded in-memory LRU in front of an optional sqlite file.
+    Inserts are committed in batches, so call commit or close once a run is over.
+    """
+
+    caches = {}
+
+    def __init__(self, path: str = None, size: int = 4096, commit_every: int = 256):
+        """
+        Initialize the SolutionCache object
+        :param path: str, sqlite file shared between runs and processes, memory only when None
+        :param size: int, most entries kept in memory
+        :param commit_every: int, inserts to the sqlite file between two commits
+        """
+        self.path = path
+        self.size = size
+        self.commit_every = commit_every
+        # Inserts made since the last commit, other processes do not see them yet
+        self.pending = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.pid = os.getpid()
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path, timeout=60)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS solutions (state TEXT, goal TEXT, algorithm TEXT, '
+                                    'moves TEXT, PRIMARY KEY (state, goal, algorithm)) WITHOUT ROWID')
+            self.connection.commit()
+
+    @classmethod
+    def get(cls, path: str = None, size: int = 4096) -> 'SolutionCache':
+        """
+        Get the cache of this process for a path, a forked process opens its own sqlite connection
+        :param path: str
+        :param size: int
+        :return: SolutionCache
+        """
+        cache = cls.caches.get(path)
+        if cache is None or cache.pid != os.getpid():
+            cache = cls.caches[path] = cls(path, size)
+        return cache
+
+    @classmethod
+    def commit_all(cls) -> None:
+        """
+        Commit the pending inserts of every cache this process opened
+        """
+        for cache in cls.caches.values():
+            if cache.pid == os.getpid():
+                cache.commit()
+
+    @classmethod
+    def close_all(cls) -> None:
+        """
+        Close every cache this process opened, the next get opens a fresh one
+        """
+        for path, cache in list(cls.caches.items()):
+            if cache.pid == os.getpid():
+                cache.close()
+                del cls.caches[path]
+
+    def __remember(self, key: tuple, moves: list) -> None:
+        """
+        Put an entry in the LRU, dropping the least recently used one when it is full
+        :param key: tuple
+        :param moves: list
+        """
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def lookup(self, key: tuple) -> list:
+        """
+        Look up a solution, first in memory then in the sqlite file
+        :param key: tuple of (state, goal, algorithm) strings
+        :return: list of moves, None on a miss
+        """
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return moves
+        if self.connection is not None:
+            row = self.connection.execute('SELECT moves FROM solutions WHERE state = ? AND goal = ? AND algorithm = ?',
+                                          key).fetchone()
+            if row is not None:
+                moves = row[0].split(',') if row[0] else []
+                self.__remember(key, moves)
+                self.hits += 1
+                return moves
+        self.misses += 1
+        return None
+
+    def store(self, key: tuple, moves: list) -> None:
+        """
+        Store a solution in memory and in the sqlite file
+        :param key: tuple of (state, goal, algorithm) strings
+        :param moves: list
+        """
+        self.__remember(key, moves)
+        if self.connection is not None:
+            self.connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)', (*key, ','.join(moves)))
+            self.pending += 1
+            if self.pending >= self.commit_every:
+                self.commit()
+
+    def commit(self) -> None:
+        """
+        Commit the inserts made since the last commit
+        """
+        if self.connection is not None and self.pending:
+            self.connection.commit()
+            self.pending = 0
+
+    def close(self) -> None:
+        """
+        Commit the pending inserts and close the sqlite file, the in-memory entries stay usable
+        """
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised by solve_puzzle when a search runs out of its Budget
+    """
+
+    def __init__(self, stats: SearchStats):
+        """
+        Initialize the BudgetExceeded object
+        :param stats: SearchStats of the stopped search, its exceeded attribute names the limit
+        """
+        super().__init__(f'{stats.exceeded} budget exceeded after {stats.expanded} expansions')
+        self.stats = stats
+
+
+def solve_chunk(solve_line, tasks: list) -> list:
+    """
+    Run solve_line over one chunk of tasks, the unit of work a pool worker is handed
+    :param solve_line: module level function of a script solving one batch line
+    :param tasks: list of solve_line tasks
+    :return: list of solve_line results
+    """
+    results = [solve_line(task) for task in tasks]
+    # Solutions of the chunk become visible to the other workers and to later runs
+    SolutionCache.commit_all()
+    return results
+
+
+def solve_lines(solve_line, tasks, workers: int, chunk_size: int, ordered: bool, initializer=None,
+                initargs: tuple = ()):
+    """
+    Run solve_line over the tasks, in this process or on a pool of worker processes
+    :param solve_line: module level function of a script solving one batch line, workers get it by reference
+    :param tasks: iterable of solve_line tasks
+    :param workers: int, number of worker processes, 1 solves in this process
+    :param chunk_size: int, lines handed to a worker at a time
+    :param ordered: bool, yield results in input order rather than as they finish
+    :param initializer: callable run once in each worker
+    :param initargs: tuple of arguments for the initializer
+    :return: iterator of solve_line results
+    """
+    if workers == 1:
+        yield from map(solve_line, tasks)
+        return
+    # Forked workers share the Board tables built at import copy-on-write
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    tasks = iter(tasks)
+    chunks = iter(lambda: list(itertools.islice(tasks, chunk_size)), [])
+    with context.Pool(workers, initializer, initargs) as pool:
+        # A sliding window of chunks is in flight: a new one goes out as soon as one is taken back, so the
+        # workers stay busy without the whole input being read up front
+        window = workers * 4
+        pending = deque()
+        finished = queue.SimpleQueue()
+
+        def take() -> list:
+            """
+            Wait for the next chunk to come back, the oldest one when ordered
+            :return: list of solve_line results
+            """
+            if ordered:
+                return pending.popleft().get()
+            pending.popleft()
+            results = finished.get()
+            if isinstance(results, BaseException):
+                raise results
+            return results
+
+        for chunk in chunks:
+            if ordered:
+                pending.append(pool.apply_async(solve_chunk, (solve_line, chunk)))
+            else:
+                pending.append(pool.apply_async(solve_chunk, (solve_line, chunk), callback=finished.put,
+                                                error_callback=finished.put))
+            if len(pending) == window:
+                yield from take()
+        while pending:
+            yield from take()
@@ -0,0 +1,467 @@
+import functools
+import math
+from collections import OrderedDict
+
+from search_common import MOVE_DIRECTIONS, np
+
+
+def build_move_table(width: int) -> tuple:
+    """
+    Build the legal (replacement index, move code) pairs for every blank index of a width x width board
+    :param width: int
+    :return: tuple
+    """
+    move_table = []
+    for blank_index in range(width * width):
+        i, j = divmod(blank_index, width)
+        moves = []
+        if i < width - 1:  # Tile below the blank moves up
+            moves.append((blank_index + width, 0))
+        if i > 0:  # Tile above the blank moves down
+            moves.append((blank_index - width, 1))
+        if j < width - 1:  # Tile right of the blank moves left
+            moves.append((blank_index + 1, 2))
+        if j > 0:  # Tile left of the blank moves right
+            moves.append((blank_index - 1, 3))
+        move_table.append(tuple(moves))
+    return tuple(move_table)
+
+
+def build_manhattan_table(width: int) -> tuple:
+    """
+    Build the Manhattan distance of every tile from its goal index, indexed by [tile][index]
+    :param width: int
+    :return: tuple
+    """
+    manhattan_table = []
+    for tile in range(width * width):
+        goal_i, goal_j = divmod(tile, width)  # Tile t belongs at index t, the blank at index 0
+        distances = []
+        for index in range(width * width):
+            i, j = divmod(index, width)
+            distances.append(abs(goal_i - i) + abs(goal_j - j) if tile else 0)
+        manhattan_table.append(tuple(distances))
+    return tuple(manhattan_table)
+
+
+def build_mirror_table(width: int) -> tuple:
+    """
+    Build the reflection of every index across the main diagonal, which maps the goal onto itself
+    once the tiles are relabeled by the same table
+    :param width: int
+    :return: tuple
+    """
+    return tuple((index % width) * width + index // width for index in range(width * width))
+
+
+# Direction a move takes once the board is reflected across the main diagonal
+MIRRORED_DIRECTIONS = {'U': 'L', 'L': 'U', 'D': 'R', 'R': 'D'}
+
+
+class Board:
+    """
+    Board class holding the geometry and lookup tables shared by every puzzle of one width
+    """
+
+    boards = {}
+
+    def __init__(self, width: int):
+        """
+        Initialize the Board object
+        :param width: int
+        """
+        self.width = width
+        self.size = width * width
+        # 4 bits per tile covers up to the 15-puzzle, the 24-puzzle needs 5
+        self.bits = max(4, (self.size - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.move_table = build_move_table(width)
+        self.manhattan_table = build_manhattan_table(width)
+        self.mirror_table = build_mirror_table(width)
+        self.goal = self.pack(list(range(self.size)))
+
+    @classmethod
+    def get(cls, width: int) -> 'Board':
+        """
+        Get the shared Board for a width, building its tables on first use
+        :param width: int
+        :return: Board
+        """
+        if width not in cls.boards:
+            cls.boards[width] = cls(width)
+        return cls.boards[width]
+
+    def pack(self, tiles: list) -> int:
+        """
+        Pack a list of tiles into an int, with the blank stored as 0
+        :param tiles: list
+        :return: int
+        """
+        packed = 0
+        for index, tile in enumerate(tiles):
+            packed |= tile << (index * self.bits)
+        return packed
+
+    def unpack(self, packed: int) -> list:
+        """
+        Unpack a packed state back into its list of tiles
+        :param packed: int
+        :return: list
+        """
+        return [(packed >> (index * self.bits)) & self.mask for index in range(self.size)]
+
+    def format(self, packed: int) -> str:
+        """
+        Format a packed state as a puzzle string, comma separated once tiles take two digits
+        :param packed: int
+        :return: str
+        """
+        labels = [str(tile) if tile else '_' for tile in self.unpack(packed)]
+        return ''.join(labels) if self.size <= 10 else ','.join(labels)
+
+    def mirror(self, packed: int) -> int:
+        """
+        Reflect a packed state across the main diagonal and relabel its tiles to match,
+        a board and its mirror need the same number of moves
+        :param packed: int
+        :return: int
+        """
+        mirrored = 0
+        for index in range(self.size):
+            tile = (packed >> (index * self.bits)) & self.mask
+            mirrored |= self.mirror_table[tile] << (self.mirror_table[index] * self.bits)
+        return mirrored
+
+    def canonical(self, packed: int) -> tuple:
+        """
+        Pick the smaller of a packed state and its mirror as the representative of both
+        :param packed: int
+        :return: tuple of (canonical packed state, whether it is the mirror)
+        """
+        mirrored = self.mirror(packed)
+        if mirrored < packed:
+            return mirrored, True
+        return packed, False
+
+    def is_goal(self, packed: int) -> bool:
+        """
+        Check if a packed state is the goal
+        :param packed: int
+        :return: bool
+        """
+        return packed == self.goal
+
+    def find_goal(self, layer) -> int:
+        """
+        Find the goal state in a sorted NumPy layer of packed states
+        :param layer: sorted uint64 array
+        :return: int, index of the goal in the layer, -1 if there is none
+        """
+        index = int(np.searchsorted(layer, np.uint64(self.goal)))
+        if index < len(layer) and layer[index] == self.goal:
+            return index
+        return -1
+
+    def mirror_moves(self, moves: list) -> list:
+        """
+        Turn a solution of a board into the solution of its mirror, and back again
+        :param moves: list
+        :return: list
+        """
+        return [f'{self.mirror_table[int(move[:-1])]}{MIRRORED_DIRECTIONS[move[-1]]}' for move in moves]
+
+
+def manhattan_distance(packed: int, board: Board) -> int:
+    """
+    Sum the Manhattan distances of every tile from its goal index
+    :param packed: int
+    :param board: Board
+    :return: int
+    """
+    manhattan_table = board.manhattan_table
+    bits = board.bits
+    mask = board.mask
+    return sum(manhattan_table[(packed >> (index * bits)) & mask][index] for index in range(board.size))
+
+
+def misplaced_tiles(packed: int, board: Board) -> int:
+    """
+    Count the tiles that are not on their goal index, the blank left out
+    :param packed: int
+    :param board: Board
+    :return: int
+    """
+    count = 0
+    for index in range(1, board.size):
+        if (packed >> (index * board.bits)) & board.mask != index:
+            count += 1
+    return count
+
+
+class Heuristic:
+    """
+    Heuristic plug-in: a function registered by name that scores a packed state, behind a bounded
+    LRU memo so a state reached along several paths is only scored once. Functions cheaper than a memo lookup
+    are registered without one, and an incremental one is the Manhattan distance every Puzzle keeps up to date.
+    """
+
+    functions = {}
+    heuristics = {}
+
+    def __init__(self, function, board: Board, memoize: bool = True, incremental: bool = False, size: int = 65536):
+        """
+        Initialize the Heuristic object
+        :param function: callable taking a packed state and its Board, returning an admissible estimate
+        :param board: Board
+        :param memoize: bool, keep scores in the memo
+        :param incremental: bool, puzzles carry this score, updated move by move, so searches read it off them
+        :param size: int, states kept in the memo
+        """
+        self.function = function
+        self.board = board
+        self.memoize = memoize
+        self.incremental = incremental
+        self.size = size
+        self.memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def register(cls, name: str, function, memoize: bool = True, incremental: bool = False) -> None:
+        """
+        Register a heuristic function under a name, replacing any earlier one of the same name
+        :param name: str
+        :param function: callable taking a packed state and its Board, returning an admissible estimate
+        :param memoize: bool, put the memo in front of the function, off for functions cheaper than a lookup
+        :param incremental: bool, the function is the Manhattan distance every Puzzle keeps up to date
+        """
+        cls.functions[name] = (function, memoize, incremental)
+        # Memos filled by the function being replaced would hand out its scores
+        for key in [key for key in cls.heuristics if key[0] == name]:
+            del cls.heuristics[key]
+
+    @classmethod
+    def get(cls, name: str, board: Board) -> 'Heuristic':
+        """
+        Get the shared Heuristic of a name for a board, its memo persists from one solve to the next
+        :param name: str, a registered name
+        :param board: Board
+        :return: Heuristic
+        """
+        key = (name, board.width)
+        if key not in cls.heuristics:
+            if name not in cls.functions:
+                raise ValueError(f'Unknown heuristic {name}')
+            function, memoize, incremental = cls.functions[name]
+            cls.heuristics[key] = cls(function, board, memoize, incremental)
+        return cls.heuristics[key]
+
+    def scorer(self):
+        """
+        Get the callable a search scores packed states with, the function itself when it is not memoized
+        :return: callable taking a packed state
+        """
+        if self.memoize:
+            return self
+        return functools.partial(self.function, board=self.board)
+
+    def __call__(self, packed: int) -> int:
+        """
+        Score a packed state, from the memo when it was scored before
+        :param packed: int
+        :return: int
+        """
+        memo = self.memo
+        score = memo.get(packed)
+        if score is not None:
+            memo.move_to_end(packed)
+            self.hits += 1
+            return score
+        self.misses += 1
+        score = self.function(packed, self.board)
+        memo[packed] = score
+        if len(memo) > self.size:
+            memo.popitem(last=False)
+        return score
+
+
+# Puzzles keep the Manhattan distance up to date move by move, and counting misplaced tiles costs less than the memo
+Heuristic.register('manhattan', manhattan_distance, memoize=False, incremental=True)
+# The straight line distance of the assignment sums the grid distance of every tile, the same as Manhattan
+Heuristic.register('straight_line', manhattan_distance, memoize=False, incremental=True)
+Heuristic.register('misplaced', misplaced_tiles, memoize=False)
+
+
+class Puzzle:
+    """
+    Puzzle class to represent the sliding block puzzle on a width x width board
+    """
+
+    # Registered Heuristic an AStar without a heuristic of its own scores this puzzle class with
+    heuristic_name = 'manhattan'
+
+    def __init__(self, puzzle_string: str, width: int = None):
+        """
+        Initialize the Puzzle object
+        :param puzzle_string: str, tiles separated by commas, which can be left out if every tile is one digit
+        :param width: int, inferred from the number of tiles when None
+        """
+        tiles = self.__load_puzzle(puzzle_string, width)
+        self.board = Board.get(math.isqrt(len(tiles)))
+        self.packed = self.board.pack(tiles)
+        self.blank_index = tiles.index(0)
+        self.is_solvable = self.__is_solvable(tiles)
+        if not self.is_solvable:
+            raise ValueError('Puzzle is not solvable')
+        self.is_solved = self.__is_solved()
+        self.parent = None
+        self.move = None
+        self.depth = 0
+        # Manhattan distance, moves update it by the moved tile's delta
+        self.heuristic = manhattan_distance(self.packed, self.board)
+
+    # ---- Helper Functions ----
+
+    def __is_solvable(self, tiles: list) -> bool:
+        """
+        Check if the goal can be reached from the tiles
+        :param tiles: list
+        :return: bool
+        """
+        numbers = [tile for tile in tiles if tile]
+        inversions = 0
+        for i in range(len(numbers)):
+            for j in range(i + 1, len(numbers)):
+                if numbers[i] > numbers[j]:
+                    inversions += 1
+        if self.board.width % 2 == 0:
+            # On even widths a vertical move passes an odd number of tiles and changes the blank row by one
+            inversions += self.blank_index // self.board.width
+        return inversions % 2 == 0
+
+    def __is_solved(self) -> bool:
+        """
+        Check if the puzzle is solved
+        :return: bool
+        """
+        return self.packed == self.board.goal
+
+    def __load_puzzle(self, puzzle_string: str, width: int = None) -> list:
+        """
+        Load the puzzle string and return its tiles, 0 for the blank
+        :param puzzle_string: str
+        :param width: int
+        :return: list
+        """
+        labels = puzzle_string.split(',') if ',' in puzzle_string else list(puzzle_string)
+        try:
+            tiles = [0 if label.strip() == '_' else int(label) for label in labels]
+        except ValueError:
+            raise ValueError('Invalid input')
+        if width is None:
+            width = math.isqrt(len(tiles))
+        if width < 2 or len(tiles) != width * width or sorted(tiles) != list(range(width * width)):
+            raise ValueError('Invalid input')
+        return tiles
+
+    # ---- Use Functions ----
+
+    @classmethod
+    def from_packed(cls, packed: int, blank_index: int, board: Board = None) -> 'Puzzle':
+        """
+        Build a puzzle straight from a packed state, skipping parsing and the solvability check
+        :param packed: int
+        :param blank_index: int
+        :param board: Board, the 3x3 board when None
+        :return: Puzzle
+        """
+        puzzle = cls.__new__(cls)
+        puzzle.board = Board.get(3) if board is None else board
+        puzzle.packed = packed
+        puzzle.blank_index = blank_index
+        puzzle.is_solvable = True
+        puzzle.is_solved = puzzle.__is_solved()
+        puzzle.parent = None
+        puzzle.move = None
+        puzzle.depth = 0
+        return puzzle
+
+    @property
+    def value(self) -> str:
+        """
+        Get the puzzle string decoded from the packed state
+        :return: str
+        """
+        return self.board.format(self.packed)
+
+    def tile(self, index: int) -> int:
+        """
+        Get the tile at the given index, 0 for the blank
+        :param index: int
+        :return: int
+        """
+        return (self.packed >> (index * self.board.bits)) & self.board.mask
+
+    @property
+    def moves(self) -> list:
+        """
+        Get the moves that led to this puzzle, rebuilt by walking the parent pointers
+        :return: list
+        """
+        moves = []
+        puzzle = self
+        while puzzle.parent is not None:
+            tile = puzzle.tile(puzzle.parent.blank_index)
+            moves.append(f'{tile}{MOVE_DIRECTIONS[puzzle.move]}')
+            puzzle = puzzle.parent
+        moves.reverse()
+        return moves
+
+    def execute_move(self, move: tuple) -> 'Puzzle':
+        """
+        Execute a move on the puzzle
+        :param move: tuple of (replacement index, move code) from the board's move table
+        :return: Puzzle
+        """
+        board = self.board
+        replacement_index, move_code = move
+        shift = replacement_index * board.bits
+        tile = (self.packed >> shift) & board.mask
+        packed = self.packed - (tile << shift) + (tile << (self.blank_index * board.bits))
+        new_puzzle = self.from_packed(packed, replacement_index, board)
+        new_puzzle.parent = self
+        new_puzzle.move = move_code
+        new_puzzle.depth = self.depth + 1
+        # Only the moved tile changes position, so adjust the parent's distance by its delta
+        distances = board.manhattan_table[tile]
+        new_puzzle.heuristic = self.heuristic - distances[replacement_index] + distances[self.blank_index]
+        return new_puzzle
+
+    @property
+    def available_moves(self) -> tuple:
+        """
+        Get the available moves for the puzzle
+        :return: tuple of (replacement index, move code) pairs
+        """
+        return self.board.move_table[self.blank_index]
+
+    def __repr__(self) -> str:
+        """
+        String representation of the Puzzle object
+        :return: str
+        """
+        labels = [str(tile) if tile else '_' for tile in self.board.unpack(self.packed)]
+        pad = len(str(self.board.size - 1))
+        width = self.board.width
+        # Print the puzzle in a width x width grid
+        rows = [' '.join(label.rjust(pad) for label in labels[i:i + width]) for i in range(0, len(labels), width)]
+        return '\n' + '\n'.join(rows) + '\n'
+
+
+# Question 1.1.e
+class SL_Puzzle(Puzzle):
+    """
+    Puzzle class to represent the sliding block puzzle that uses Straight Line Distance heuristic
+    """
+
+    heuristic_name = 'straight_line'
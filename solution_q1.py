@@ -1,126 +1,14 @@
+import argparse
+import heapq
+import itertools
+import os
+import sys
+import time
 from collections import deque
 
-
-class Puzzle:
-    """
-    Puzzle class to represent the 8-block puzzle
-    """
-
-    def __init__(self, puzzle_string: str):
-        """
-        Initialize the Puzzle object
-        :param puzzle_string: str
-        """
-        self.value = self.__load_puzzle(puzzle_string)
-        self.is_solvable = self.__is_solvable()
-        if not self.is_solvable:
-            raise ValueError('Puzzle is not solvable')
-        self.is_solved = self.__is_solved()
-        self.moves = []
-
-    # ---- Helper Functions ----
-
-    def __is_solvable(self) -> bool:
-        inversions = 0
-        self.state = self.value.replace('_', '9')
-        for i in range(len(self.state)):
-            for j in range(i + 1, len(self.state)):
-                if self.state[i] != "9" and self.state[j] != "9" and self.state[i] > self.state[j]:
-                    inversions += 1
-        return inversions % 2 == 0
-
-    def __is_solved(self) -> bool:
-        """
-        Check if the puzzle is solved
-        :return: bool
-        """
-        return self.value == '_12345678'
-
-    def __load_puzzle(self, puzzle_string: str) -> str:
-        """
-        Load the puzzle string and return it
-        :param puzzle_string: str
-        :return: str
-        """
-        if ',' in puzzle_string:
-            puzzle_string = puzzle_string.replace(',', '')
-        if len(puzzle_string) != 9:
-            raise ValueError('Invalid input')
-        return puzzle_string
-
-    # ---- Use Functions ----
-
-    def execute_move(self, move: dict) -> 'Puzzle':
-        """
-        Execute a move on the puzzle
-        :param move: dict
-        :return: Puzzle
-        """
-        new_value = list(self.value)
-        new_value[move['replacement_index']], new_value[self.value.index('_')] = new_value[self.value.index('_')], move[
-            'replacement_value']
-        new_puzzle = Puzzle(''.join(new_value))
-        new_puzzle.moves = self.moves + [move['move']]
-        new_puzzle.heuristic = move['heuristic']
-        return new_puzzle
-
-    @property
-    def available_moves(self) -> list:
-        """
-        Get the available moves for the puzzle
-        :return: list
-        """
-        blank_index = self.value.index('_')
-        i, j = divmod(blank_index, 3)
-        moves = []
-        if i < 2:  # Blank can move up
-            replacement_index = blank_index + 3
-            move = {'direction': 'D', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}U',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if i > 0:  # Blank can move down
-            replacement_index = blank_index - 3
-            move = {'direction': 'U', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}D',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if j < 2:  # Blank can move left
-            replacement_index = blank_index + 1
-            move = {'direction': 'R', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}L',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if j > 0:  # Blank can move right
-            replacement_index = blank_index - 1
-            move = {'direction': 'L', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}R',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        return moves
-
-    def __manhattan_distance(self, index: int) -> int:
-        """
-        Calculate the Manhattan distance between the current index and the goal index
-        :param index: int
-        :return: int
-        """
-        goal_index = '_12345678'.index(self.value[index])
-        goal_i, goal_j = divmod(goal_index, 3)
-        i, j = divmod(index, 3)
-        return abs(goal_i - i) + abs(goal_j - j)
-
-    def __repr__(self) -> str:
-        """
-        String representation of the Puzzle object
-        :return: str
-        """
-        # Print the puzzle in a 3x3 grid
-        return f'\n{" ".join(self.value[:3])}\n{" ".join(self.value[3:6])}\n{" ".join(self.value[6:])}\n'
+from search_common import Budget, BudgetExceeded, IDDFS, LayerBFS, SearchStats, SolutionCache, np, solve_lines
+# Question 1.1.e is SL_Puzzle, the Straight Line Distance puzzle the classes package of the submission shares
+from sliding_puzzle import Heuristic, Puzzle, SL_Puzzle
 
 
 # Question 1.1.a
@@ -130,10 +18,17 @@ class DFS:
     Written by: Luke Kerwin
     """
 
-    def __init__(self):
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the DFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
         self.stack = deque()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def dfs(self, puzzle: Puzzle) -> bool:
         """
@@ -141,22 +36,37 @@ class DFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.stack.append(puzzle)
+        solved = False
 
         while self.stack:
             current_puzzle = self.stack.pop()
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
+                solved = True
+                break
 
-            for move in current_puzzle.available_moves:
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
                     self.stack.append(new_puzzle)
+            if len(self.stack) > stats.max_frontier:
+                stats.max_frontier = len(self.stack)
 
-        return False
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -173,10 +83,17 @@ class BFS:
     Written by: Luke Kerwin
     """
 
-    def __init__(self):
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the BFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
         self.queue = deque()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def bfs(self, puzzle: Puzzle) -> bool:
         """
@@ -184,19 +101,34 @@ class BFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.queue.append(puzzle)
+        solved = False
         while self.queue:
             current_puzzle = self.queue.popleft()
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
                     self.queue.append(new_puzzle)
-        return False
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -213,10 +145,18 @@ class UCS:
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
+    def __init__(self, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the UCS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
-        self.queue = deque()
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def ucs(self, puzzle: Puzzle) -> bool:
         """
@@ -224,20 +164,34 @@ class UCS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves)))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
+                    heapq.heappush(self.queue, (new_puzzle.depth, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -254,10 +208,21 @@ class AStar:
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
+    def __init__(self, heuristic=None, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the AStar object
+        :param heuristic: optional name of a registered Heuristic, or a callable scoring a packed state;
+                          the puzzle class's heuristic_name is used when it is None
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.heuristic = heuristic
         self.visited = set()
-        self.queue = deque()
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def a_star(self, puzzle: Puzzle) -> bool:
         """
@@ -265,20 +230,49 @@ class AStar:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        heuristic = self.heuristic
+        if heuristic is None:
+            heuristic = puzzle.heuristic_name
+        if isinstance(heuristic, str):
+            heuristic = Heuristic.get(heuristic, puzzle.board)
+        if isinstance(heuristic, Heuristic):
+            # Puzzles carry an incremental heuristic already, any other one is scored per child
+            heuristic = None if heuristic.incremental else heuristic.scorer()
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            # A state can sit in the queue more than once, only its cheapest copy gets expanded
+            if current_puzzle.packed in self.visited:
+                continue
+            self.visited.add(current_puzzle.packed)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves) + x.heuristic))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    if heuristic is None:
+                        priority = new_puzzle.depth + new_puzzle.heuristic
+                    else:
+                        priority = new_puzzle.depth + heuristic(new_puzzle.packed)
+                    heapq.heappush(self.queue, (priority, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        # Every push drew one number from the counter, the root's included
+        stats.finish(self.solution, len(self.visited), next(self.counter) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -288,143 +282,196 @@ class AStar:
         return self.solution
 
 
-# Question 1.1.e
-class SL_Puzzle:
-    """
-    Puzzle class to represent the 8-block puzzle that uses Straight Line Distance heuristic
-    """
+# Goal part of a SolutionCache key
+GOAL = 'blank first, tiles in order'
 
-    def __init__(self, puzzle_string: str):
-        """
-        Initialize the Puzzle object
-        :param puzzle_string: str
-        """
-        self.value = self.__load_puzzle(puzzle_string)
-        self.is_solvable = self.__is_solvable()
-        if not self.is_solvable:
-            raise ValueError('Puzzle is not solvable')
-        self.is_solved = self.__is_solved()
-        self.moves = []
-
-    # ---- Helper Functions ----
-
-    def __is_solvable(self) -> bool:
-        inversions = 0
-        self.state = self.value.replace('_', '9')
-        for i in range(len(self.state)):
-            for j in range(i + 1, len(self.state)):
-                if self.state[i] != "9" and self.state[j] != "9" and self.state[i] > self.state[j]:
-                    inversions += 1
-        return inversions % 2 == 0
-
-    def __is_solved(self) -> bool:
-        """
-        Check if the puzzle is solved
-        :return: bool
-        """
-        return self.value == '_12345678'
+# Algorithms run by solve_puzzle, 'sl' is A* on an SL_Puzzle and 'layer' is LayerBFS, offered when NumPy is there
+ALGORITHMS = ('dfs', 'iddfs', 'bfs', 'ucs', 'astar', 'sl') + (('layer',) if np is not None else ())
 
-    def __load_puzzle(self, puzzle_string: str) -> str:
-        """
-        Load the puzzle string and return it
-        :param puzzle_string: str
-        :return: str
-        """
-        if ',' in puzzle_string:
-            puzzle_string = puzzle_string.replace(',', '')
-        if len(puzzle_string) != 9:
-            raise ValueError('Invalid input')
-        return puzzle_string
+# Algorithms whose solutions are optimal, the mirror of such a solution is an optimal one for the mirrored board
+OPTIMAL_ALGORITHMS = ('iddfs', 'bfs', 'ucs', 'astar', 'sl', 'layer')
 
-    # ---- Use Functions ----
 
-    def execute_move(self, move: dict) -> 'SL_Puzzle':
-        """
-        Execute a move on the puzzle
-        :param move: dict
-        :return: SL_Puzzle
-        """
-        new_value = list(self.value)
-        new_value[move['replacement_index']], new_value[self.value.index('_')] = new_value[self.value.index('_')], move[
-            'replacement_value']
-        new_puzzle = SL_Puzzle(''.join(new_value))
-        new_puzzle.moves = self.moves + [move['move']]
-        new_puzzle.heuristic = move['heuristic']
-        return new_puzzle
-
-    @property
-    def available_moves(self) -> list:
-        """
-        Get the available moves for the puzzle
-        :return: list
-        """
-        blank_index = self.value.index('_')
-        i, j = divmod(blank_index, 3)
-        moves = []
-        if i < 2:
-            replacement_index = blank_index + 3
-            move = {'direction': 'D', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}U',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if i > 0:
-            replacement_index = blank_index - 3
-            move = {'direction': 'U', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}D',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if j < 2:
-            replacement_index = blank_index + 1
-            move = {'direction': 'R', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}L',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if j > 0:
-            replacement_index = blank_index - 1
-            move = {'direction': 'L', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}R',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        return moves
-
-    def __straight_line_distance(self, index: int) -> int:
-        """
-        Calculate the Straight Line Distance between the current index and the goal index
-        :param index: int
-        :return: int
-        """
-        goal_index = '_12345678'.index(self.value[index])
-        goal_i, goal_j = divmod(goal_index, 3)
-        i, j = divmod(index, 3)
-        distance = 0
-        for row in range(3):
-            for col in range(3):
-                tile_index = row * 3 + col
-                tile_i, tile_j = divmod(tile_index, 3)
-                tile_value = self.value[tile_index]
-                if tile_value != '_':
-                    goal_tile_index = '_12345678'.index(tile_value)
-                    goal_tile_i, goal_tile_j = divmod(goal_tile_index, 3)
-                    distance += abs(goal_tile_i - tile_i) + abs(goal_tile_j - tile_j)
-        return distance
-
-    def __repr__(self) -> str:
-        """
-        String representation of the Puzzle object
-        :return: str
-        """
-        # Print the puzzle in a 3x3 grid
-        return f'\n{" ".join(self.value[:3])}\n{" ".join(self.value[3:6])}\n{" ".join(self.value[6:])}\n'
+def load_puzzle(puzzle_string: str, algorithm: str = 'astar'):
+    """
+    Parse a puzzle string into the puzzle class the named algorithm runs on
+    :param puzzle_string: str
+    :param algorithm: str, one of ALGORITHMS
+    :return: Puzzle, or SL_Puzzle for 'sl'
+    """
+    if algorithm == 'sl':
+        return SL_Puzzle(puzzle_string)
+    return Puzzle(puzzle_string)
+
+
+def run_algorithm(puzzle, algorithm: str = 'astar', budget: Budget = None) -> tuple:
+    """
+    Run the named algorithm on a puzzle
+    :param puzzle: Puzzle or SL_Puzzle from load_puzzle
+    :param algorithm: str, one of ALGORITHMS
+    :param budget: optional Budget, the solver's stats tell whether it ran out
+    :return: tuple of (solver, whether it solved the puzzle)
+    """
+    if algorithm == 'dfs':
+        solver = DFS(budget=budget)
+        solved = solver.dfs(puzzle)
+    elif algorithm == 'iddfs':
+        solver = IDDFS(budget=budget)
+        solved = solver.iddfs(puzzle)
+    elif algorithm == 'bfs':
+        solver = BFS(budget=budget)
+        solved = solver.bfs(puzzle)
+    elif algorithm == 'layer':
+        solver = LayerBFS(budget=budget)
+        solved = solver.layer_bfs(puzzle)
+    elif algorithm == 'ucs':
+        solver = UCS(budget=budget)
+        solved = solver.ucs(puzzle)
+    else:
+        solver = AStar(budget=budget)
+        solved = solver.a_star(puzzle)
+    return solver, solved
+
+
+def solve_puzzle(puzzle_string: str, algorithm: str = 'astar', cache: SolutionCache = None,
+                 budget: Budget = None) -> tuple:
+    """
+    Solve one puzzle with the named algorithm
+    :param puzzle_string: str
+    :param algorithm: str, one of ALGORITHMS
+    :param cache: SolutionCache, answers repeated boards without searching
+    :param budget: optional Budget, BudgetExceeded is raised when the search runs out of it
+    :return: tuple of (solution list, number of expanded nodes)
+    """
+    puzzle = load_puzzle(puzzle_string, algorithm)
+    if cache is not None:
+        if algorithm in OPTIMAL_ALGORITHMS:
+            # A board and its mirror share one entry, which holds the moves of the canonical one
+            state, mirrored = puzzle.board.canonical(puzzle.packed)
+        else:
+            # What DFS returns depends on the exact board, so it is cached under that board alone
+            state, mirrored = puzzle.packed, False
+        key = (puzzle.board.format(state), GOAL, algorithm)
+        moves = cache.lookup(key)
+        if moves is not None:
+            return (puzzle.board.mirror_moves(moves) if mirrored else moves), 0
+    solver, solved = run_algorithm(puzzle, algorithm, budget)
+    if solver.stats.exceeded is not None:
+        raise BudgetExceeded(solver.stats)
+    if cache is not None and solved:
+        moves = solver.get_solution()
+        cache.store(key, puzzle.board.mirror_moves(moves) if mirrored else moves)
+    return solver.get_solution(), solver.stats.expanded
+
+
+def solve_line(task: tuple) -> tuple:
+    """
+    Solve one batch line and format its tab separated result: line number, puzzle,
+    then 'ok', moves, move count, expanded nodes and seconds,
+    or 'error' and the reason for a line that is malformed or unsolvable,
+    or 'budget', the limit that ran out, expanded nodes and seconds for a search stopped by its Budget
+    :param task: tuple of (line number, line, algorithm, cache path, cache size, Budget or None),
+                 no cache when the size is 0
+    :return: tuple of the result and whether the SolutionCache had it, None when nothing was looked up;
+             None for a blank line
+    """
+    line_number, line, algorithm, cache_path, cache_size, budget = task
+    puzzle_string = line.strip()
+    if not puzzle_string:
+        return None
+    cache = SolutionCache.get(cache_path, cache_size) if cache_size else None
+    hits = cache.hits if cache is not None else 0
+    start = time.perf_counter()
+    try:
+        solution, expanded = solve_puzzle(puzzle_string, algorithm, cache, budget)
+    except ValueError as error:
+        return f'{line_number}\t{puzzle_string}\terror\t{error}', None
+    except BudgetExceeded as error:
+        seconds = time.perf_counter() - start
+        stats = error.stats
+        return f'{line_number}\t{puzzle_string}\tbudget\t{stats.exceeded}\t{stats.expanded}\t{seconds:.4f}', None
+    seconds = time.perf_counter() - start
+    cached = cache.hits > hits if cache is not None else None
+    moves = ','.join(solution)
+    return f'{line_number}\t{puzzle_string}\tok\t{moves}\t{len(solution)}\t{expanded}\t{seconds:.4f}', cached
+
+
+def run_batch(lines, output, algorithm: str = 'astar', workers: int = 1, chunk_size: int = 16,
+              ordered: bool = True, cache_path: str = None, cache_size: int = 0, budget: Budget = None) -> tuple:
+    """
+    Solve puzzles line by line, writing each result line as soon as it is ready
+    :param lines: iterable of str, such as an open file or sys.stdin
+    :param output: writable text stream
+    :param algorithm: str, one of ALGORITHMS
+    :param workers: int, number of worker processes, 1 solves in this process
+    :param chunk_size: int, lines handed to a worker at a time
+    :param ordered: bool, write results in input order rather than as they finish
+    :param cache_path: str, sqlite file of the SolutionCache, memory only when None
+    :param cache_size: int, entries each process keeps in memory, 0 turns the cache off
+    :param budget: optional Budget applied to every search, lines that run out of it are reported as 'budget'
+    :return: tuple of SolutionCache hits and misses
+    """
+    tasks = ((line_number, line, algorithm, cache_path, cache_size, budget)
+             for line_number, line in enumerate(lines, 1))
+    hits = 0
+    misses = 0
+    results = solve_lines(solve_line, tasks, workers, chunk_size, ordered)
+    try:
+        for result in results:
+            if result is None:
+                continue
+            text, cached = result
+            output.write(text + '\n')
+            output.flush()
+            if cached is not None:
+                hits += cached
+                misses += not cached
+    finally:
+        # Lines solved in this process leave their last inserts uncommitted
+        SolutionCache.close_all()
+    return hits, misses
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', metavar='PATH',
+                        help="solve every line of PATH, or of stdin when PATH is '-', instead of input.txt")
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='astar',
+                        help='algorithm used by --batch')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes used by --batch, 0 for one per core')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='lines handed to a worker at a time')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write batch results as they finish instead of in input order')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='keep batch solutions in a sqlite file at PATH and reuse them for repeated boards')
+    parser.add_argument('--cache-size', type=int, default=4096,
+                        help='solutions each process keeps in memory in front of --cache')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='give up on a batch line after SECONDS of searching')
+    parser.add_argument('--max-expanded', type=int, metavar='N',
+                        help='give up on a batch line after expanding N nodes')
+    parser.add_argument('--max-visited', type=int, metavar='N',
+                        help='give up on a batch line once N states were visited')
+    args = parser.parse_args()
+
+    if args.batch:
+        workers = args.workers or os.cpu_count()
+        cache_size = args.cache_size if args.cache else 0
+        budget = None
+        if args.timeout is not None or args.max_expanded is not None or args.max_visited is not None:
+            budget = Budget(args.timeout, args.max_expanded, args.max_visited)
+        with open(args.batch, 'r') if args.batch != '-' else sys.stdin as f:
+            hits, misses = run_batch(f, sys.stdout, args.algorithm, workers, args.chunk_size, not args.unordered,
+                                     args.cache, cache_size, budget)
+        if args.cache:
+            print(f'cache: {hits} hits, {misses} misses', file=sys.stderr)
+        raise SystemExit
+
     # Assuming input.txt is in the same directory as this file
     with open('input.txt', 'r') as f:
-        puzzle_string = f.readline().strip().replace(',', '')
+        puzzle_string = f.readline().strip()
         f.close()
 
     puzzle = Puzzle(puzzle_string)
@@ -1,20 +1,643 @@
-from collections import deque
+from collections import OrderedDict, deque
+from math import factorial
+import argparse
+import heapq
 import itertools
+import mmap
+import os
+import sys
+import time
 
+from search_common import (MOVE_DIRECTIONS, Budget, BudgetExceeded, IDDFS, LayerBFS, SearchStats, SolutionCache,
+                           np, solve_lines)
 
-goals = []
-for i_1 in range(9):
-    for i_2 in range(i_1, 9):
-        for i_3 in range(i_2, 9):
-            if i_1 + i_2 + i_3 == 11:
-                top_row = itertools.permutations([i_1, i_2, i_3])
-                for t in top_row:
-                    others = set([i for i in range(9)]).difference(t)
-                    others = itertools.permutations(list(others))
-                    t = [str(i) if i != 0 else '_' for i in t]
-                    for other in others:
-                        others = [str(i) if i != 0 else '_' for i in other]
-                        goals.append(''.join(t) + ''.join(others))
+
+def pack_puzzle(puzzle_string: str) -> int:
+    """
+    Pack a puzzle string into an int, 4 bits per tile, with the blank stored as 0
+    :param puzzle_string: str
+    :return: int
+    """
+    packed = 0
+    for index, tile in enumerate(puzzle_string):
+        if tile != '_':
+            packed |= int(tile) << (index << 2)
+    return packed
+
+
+def unpack_puzzle(packed: int) -> str:
+    """
+    Unpack a packed puzzle back into its string form
+    :param packed: int
+    :return: str
+    """
+    tiles = [(packed >> (index << 2)) & 0xF for index in range(9)]
+    return ''.join(str(tile) if tile else '_' for tile in tiles)
+
+
+FACTORIALS = [factorial(i) for i in range(10)]
+
+
+def rank_packed(packed: int) -> int:
+    """
+    Rank a packed puzzle by its Lehmer code, giving a dense index in 0..9!-1, the blank counting as tile 0
+    :param packed: int
+    :return: int
+    """
+    rank = 0
+    seen = 0
+    for index in range(9):
+        tile = (packed >> (index << 2)) & 0xF
+        rank += (tile - bin(seen & ((1 << tile) - 1)).count('1')) * FACTORIALS[8 - index]
+        seen |= 1 << tile
+    return rank
+
+
+def unrank_packed(rank: int) -> int:
+    """
+    Inverse of rank_packed
+    :param rank: int
+    :return: int
+    """
+    free = list(range(9))
+    packed = 0
+    for index in range(9):
+        digit, rank = divmod(rank, FACTORIALS[8 - index])
+        packed |= free.pop(digit) << (index << 2)
+    return packed
+
+
+def build_move_table() -> tuple:
+    """
+    Build the legal (replacement index, move code) pairs for every blank index
+    :return: tuple
+    """
+    move_table = []
+    for blank_index in range(9):
+        i, j = divmod(blank_index, 3)
+        moves = []
+        if i < 2:  # Tile below the blank moves up
+            moves.append((blank_index + 3, 0))
+        if i > 0:  # Tile above the blank moves down
+            moves.append((blank_index - 3, 1))
+        if j < 2:  # Tile right of the blank moves left
+            moves.append((blank_index + 1, 2))
+        if j > 0:  # Tile left of the blank moves right
+            moves.append((blank_index - 1, 3))
+        move_table.append(tuple(moves))
+    return tuple(move_table)
+
+
+MOVE_TABLE = build_move_table()
+
+
+class Board:
+    """
+    Board class giving IDDFS and LayerBFS the 3x3 geometry and the top row goal
+    """
+
+    width = 3
+    size = 9
+    bits = 4
+    mask = 0xF
+    move_table = MOVE_TABLE
+
+    def is_goal(self, packed: int) -> bool:
+        """
+        Check if the top row of a packed state sums to 11
+        :param packed: int
+        :return: bool
+        """
+        return (packed & 0xF) + ((packed >> 4) & 0xF) + ((packed >> 8) & 0xF) == 11
+
+    def find_goal(self, layer) -> int:
+        """
+        Find a goal state in a NumPy layer of packed states
+        :param layer: uint64 array
+        :return: int, index of the first goal in the layer, -1 if there is none
+        """
+        nibble = np.uint64(0xF)
+        sums = (layer & nibble) + ((layer >> np.uint64(4)) & nibble) + ((layer >> np.uint64(8)) & nibble)
+        hits = np.flatnonzero(sums == 11)
+        return int(hits[0]) if len(hits) else -1
+
+
+BOARD = Board()
+
+
+GOAL_SET_MAGIC = b'GST1'
+DISTANCE_MAGIC = b'GDT1'
+
+
+class GoalSet:
+    """
+    Set of goal boards, the boards whose top row sums to 11, stored as one bit per permutation rank
+    """
+
+    # Shared goal sets by the file caching them, None for one that only lives in memory
+    goal_sets = {}
+
+    def __init__(self, bits):
+        """
+        Initialize the GoalSet object
+        :param bits: bytes-like object, bit rank & 7 of byte rank >> 3 is set for every goal rank
+        """
+        self.bits = bits
+
+    @classmethod
+    def get(cls, path: str = None) -> 'GoalSet':
+        """
+        Get the shared goal set cached in the file at path, built on first use, or any shared one when path is None
+        :param path: str
+        :return: GoalSet
+        """
+        if path is None:
+            if not cls.goal_sets:
+                cls.goal_sets[None] = cls.build()
+            return next(iter(cls.goal_sets.values()))
+        if path not in cls.goal_sets:
+            # A set already built in memory is saved to the file rather than built again
+            if None in cls.goal_sets and not os.path.exists(path):
+                cls.goal_sets[None].save(path)
+            cls.goal_sets[path] = cls.open(path)
+        return cls.goal_sets[path]
+
+    @classmethod
+    def build(cls) -> 'GoalSet':
+        """
+        Build the set from every top row triple summing to 11 and every order of the other six tiles
+        :return: GoalSet
+        """
+        bits = bytearray((factorial(9) + 7) >> 3)
+        for top_row in itertools.permutations(range(9), 3):
+            if sum(top_row) == 11:
+                rest = [tile for tile in range(9) if tile not in top_row]
+                for others in itertools.permutations(rest):
+                    packed = 0
+                    for index, tile in enumerate(top_row + others):
+                        packed |= tile << (index << 2)
+                    rank = rank_packed(packed)
+                    bits[rank >> 3] |= 1 << (rank & 7)
+        return cls(bits)
+
+    @classmethod
+    def load(cls, path: str) -> 'GoalSet':
+        """
+        Load a saved set as a read-only memory map of the file
+        :param path: str
+        :return: GoalSet
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(GOAL_SET_MAGIC) + ((factorial(9) + 7) >> 3)
+        if data[:len(GOAL_SET_MAGIC)] != GOAL_SET_MAGIC or len(data) != size:
+            raise ValueError(f'{path} is not a goal set')
+        return cls(memoryview(data)[len(GOAL_SET_MAGIC):])
+
+    @classmethod
+    def open(cls, path: str) -> 'GoalSet':
+        """
+        Load the set at path, building and saving it first if the file does not exist
+        :param path: str
+        :return: GoalSet
+        """
+        if not os.path.exists(path):
+            cls.build().save(path)
+        return cls.load(path)
+
+    def save(self, path: str) -> None:
+        """
+        Save the set as a magic prefix followed by the raw bits
+        :param path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(GOAL_SET_MAGIC)
+            f.write(self.bits)
+
+    def __contains__(self, packed: int) -> bool:
+        """
+        Check if a packed state is a goal board
+        :param packed: int
+        :return: bool
+        """
+        rank = rank_packed(packed)
+        return bool(self.bits[rank >> 3] & (1 << (rank & 7)))
+
+    def __iter__(self):
+        """
+        Iterate over the packed goal boards in rank order
+        :return: iterator of int
+        """
+        for byte_index, byte in enumerate(self.bits):
+            while byte:
+                low_bit = byte & -byte
+                yield unrank_packed((byte_index << 3) + low_bit.bit_length() - 1)
+                byte ^= low_bit
+
+    def __len__(self) -> int:
+        """
+        Number of goal boards
+        :return: int
+        """
+        return sum(bin(byte).count('1') for byte in self.bits)
+
+
+# Distance stored for states that cannot reach any goal
+UNREACHABLE = 255
+
+
+def build_goal_distances() -> bytearray:
+    """
+    Run one backward breadth first search seeded with every board of the GoalSet,
+    so each state gets its distance to the nearest goal
+    :return: bytearray of distances indexed by rank_packed
+    """
+    distances = bytearray([UNREACHABLE]) * factorial(9)
+    frontier = []
+    for packed in GoalSet.get():
+        distances[rank_packed(packed)] = 0
+        blank_index = 0
+        while (packed >> (blank_index << 2)) & 0xF:
+            blank_index += 1
+        frontier.append((packed, blank_index))
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for packed, blank_index in frontier:
+            for replacement_index, _ in MOVE_TABLE[blank_index]:
+                shift = replacement_index << 2
+                tile = (packed >> shift) & 0xF
+                child = packed - (tile << shift) + (tile << (blank_index << 2))
+                rank = rank_packed(child)
+                if distances[rank] == UNREACHABLE:
+                    distances[rank] = distance
+                    next_frontier.append((child, replacement_index))
+        frontier = next_frontier
+    return distances
+
+
+class GoalDistanceTable:
+    """
+    Exact distance to the nearest goal board for every 8-puzzle state
+    """
+
+    # Shared tables by the file caching them, None for one that only lives in memory
+    distance_tables = {}
+
+    def __init__(self, distances):
+        """
+        Initialize the GoalDistanceTable object
+        :param distances: bytes-like object indexed by rank_packed
+        """
+        self.distances = distances
+
+    @classmethod
+    def get(cls, path: str = None) -> 'GoalDistanceTable':
+        """
+        Get the shared table cached in the file at path, built on first use, or any shared one when path is None
+        :param path: str
+        :return: GoalDistanceTable
+        """
+        if path is None:
+            if not cls.distance_tables:
+                cls.distance_tables[None] = cls.build()
+            return next(iter(cls.distance_tables.values()))
+        if path not in cls.distance_tables:
+            # A table already built in memory is saved to the file rather than built again
+            if None in cls.distance_tables and not os.path.exists(path):
+                cls.distance_tables[None].save(path)
+            cls.distance_tables[path] = cls.open(path)
+        return cls.distance_tables[path]
+
+    @classmethod
+    def build(cls) -> 'GoalDistanceTable':
+        """
+        Build the table from scratch
+        :return: GoalDistanceTable
+        """
+        return cls(build_goal_distances())
+
+    @classmethod
+    def load(cls, path: str) -> 'GoalDistanceTable':
+        """
+        Load a saved table as a read-only memory map of the file
+        :param path: str
+        :return: GoalDistanceTable
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(DISTANCE_MAGIC)] != DISTANCE_MAGIC or len(data) != len(DISTANCE_MAGIC) + factorial(9):
+            raise ValueError(f'{path} is not a goal distance table')
+        return cls(memoryview(data)[len(DISTANCE_MAGIC):])
+
+    @classmethod
+    def open(cls, path: str) -> 'GoalDistanceTable':
+        """
+        Load the table at path, building and saving it first if the file does not exist
+        :param path: str
+        :return: GoalDistanceTable
+        """
+        if not os.path.exists(path):
+            cls.build().save(path)
+        return cls.load(path)
+
+    def save(self, path: str) -> None:
+        """
+        Save the table as a magic prefix followed by the raw distances
+        :param path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(DISTANCE_MAGIC)
+            f.write(self.distances)
+
+    def __call__(self, packed: int) -> int:
+        """
+        Get the exact distance of a packed state to the nearest goal, UNREACHABLE if there is none
+        :param packed: int
+        :return: int
+        """
+        return self.distances[rank_packed(packed)]
+
+
+def build_top_row_distances() -> bytearray:
+    """
+    Run a backward breadth first search from the goals over abstract states that keep only the blank index
+    and the three top row tiles. A tile sliding up into the top row may be any tile not already there,
+    so every real move maps onto an abstract move and the abstract distances never overestimate.
+    :return: bytearray of distances indexed by blank index << 12 | top row bits of the packed state
+    """
+    states = []
+    for blank_index in range(9):
+        for top_row in itertools.permutations(range(1, 9), 3 if blank_index > 2 else 2):
+            top_row = list(top_row)
+            if blank_index < 3:
+                top_row.insert(blank_index, 0)
+            states.append((blank_index, tuple(top_row)))
+    # Reverse edges of the abstract graph, keyed by the abstract code
+    parents = {}
+    for blank_index, top_row in states:
+        code = (blank_index << 12) | top_row[0] | (top_row[1] << 4) | (top_row[2] << 8)
+        for replacement_index, _ in MOVE_TABLE[blank_index]:
+            if replacement_index < 3 and blank_index < 3:
+                # A top row tile slides sideways
+                child = list(top_row)
+                child[blank_index] = top_row[replacement_index]
+                child[replacement_index] = 0
+                children = [child]
+            elif replacement_index < 3:
+                # A top row tile slides down out of the top row
+                child = list(top_row)
+                child[replacement_index] = 0
+                children = [child]
+            elif blank_index < 3:
+                # Any tile outside the top row slides up into the blank
+                children = []
+                for tile in range(1, 9):
+                    if tile not in top_row:
+                        child = list(top_row)
+                        child[blank_index] = tile
+                        children.append(child)
+            else:
+                children = [top_row]
+            for child in children:
+                child_code = (replacement_index << 12) | child[0] | (child[1] << 4) | (child[2] << 8)
+                parents.setdefault(child_code, []).append(code)
+    distances = bytearray([UNREACHABLE]) * (9 << 12)
+    frontier = []
+    for blank_index, top_row in states:
+        if sum(top_row) == 11:
+            code = (blank_index << 12) | top_row[0] | (top_row[1] << 4) | (top_row[2] << 8)
+            distances[code] = 0
+            frontier.append(code)
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for code in frontier:
+            for parent in parents.get(code, ()):
+                if distances[parent] == UNREACHABLE:
+                    distances[parent] = distance
+                    next_frontier.append(parent)
+        frontier = next_frontier
+    return distances
+
+
+class TopRowDatabase:
+    """
+    Admissible pattern database heuristic for the top row sum goal, built over the blank and the top row tiles
+    """
+
+    database = None
+
+    def __init__(self, distances):
+        """
+        Initialize the TopRowDatabase object
+        :param distances: bytes-like object from build_top_row_distances
+        """
+        self.distances = distances
+
+    @classmethod
+    def get(cls) -> 'TopRowDatabase':
+        """
+        Get the shared database, built on first use
+        :return: TopRowDatabase
+        """
+        if cls.database is None:
+            cls.database = cls.build()
+        return cls.database
+
+    @classmethod
+    def build(cls) -> 'TopRowDatabase':
+        """
+        Build the database from scratch, it only has a few thousand abstract states
+        :return: TopRowDatabase
+        """
+        return cls(build_top_row_distances())
+
+    def __call__(self, packed: int) -> int:
+        """
+        Get the abstract distance of a packed state to the nearest goal
+        :param packed: int
+        :return: int
+        """
+        blank_index = 0
+        while (packed >> (blank_index << 2)) & 0xF:
+            blank_index += 1
+        return self.distances[(blank_index << 12) | (packed & 0xFFF)]
+
+
+def build_goal_manhattan_distances() -> bytearray:
+    """
+    Take, for every state, the smallest Manhattan distance of the tiles, blank left out, over every top row
+    summing to 11. A tile of the top row counts its distance to its own cell, any other tile counts 1 while it
+    is still in the top row. Each move slides one tile one cell, so it never overestimates the moves to a goal.
+    :return: bytearray of distances indexed by rank_packed
+    """
+    # Per top row, the cost of its three tiles by their indices, less the 1 a top row tile that does not belong
+    # there would count; adding the number of tiles in the top row makes it the distance
+    costs = []
+    for top_row in itertools.permutations(range(9), 3):
+        if sum(top_row) != 11:
+            continue
+        cost = [0] * 729
+        for indices in itertools.product(range(9), repeat=3):
+            for goal_j, (tile, index) in enumerate(zip(top_row, indices)):
+                if tile:
+                    i, j = divmod(index, 3)
+                    cost[indices[0] * 81 + indices[1] * 9 + indices[2]] += i + abs(goal_j - j) - (index < 3)
+        costs.append((*top_row, cost))
+    distances = bytearray(FACTORIALS[9])
+    indices = [0] * 9
+    # Permutations come out in rank order
+    for rank, tiles in enumerate(itertools.permutations(range(9))):
+        for index, tile in enumerate(tiles):
+            indices[tile] = index
+        distances[rank] = (bool(tiles[0]) + bool(tiles[1]) + bool(tiles[2])
+                           + min([cost[indices[a] * 81 + indices[b] * 9 + indices[c]] for a, b, c, cost in costs]))
+    return distances
+
+
+class GoalManhattanTable:
+    """
+    Goal Manhattan distance of every state, read with one lookup instead of a minimum over the goal top rows
+    """
+
+    table = None
+
+    def __init__(self, distances):
+        """
+        Initialize the GoalManhattanTable object
+        :param distances: bytes-like object from build_goal_manhattan_distances
+        """
+        self.distances = distances
+
+    @classmethod
+    def get(cls) -> 'GoalManhattanTable':
+        """
+        Get the shared table, built on first use
+        :return: GoalManhattanTable
+        """
+        if cls.table is None:
+            cls.table = cls.build()
+        return cls.table
+
+    @classmethod
+    def build(cls) -> 'GoalManhattanTable':
+        """
+        Build the table from scratch, which takes a few seconds
+        :return: GoalManhattanTable
+        """
+        return cls(build_goal_manhattan_distances())
+
+    def __call__(self, packed: int) -> int:
+        """
+        Get the goal Manhattan distance of a packed state
+        :param packed: int
+        :return: int
+        """
+        return self.distances[rank_packed(packed)]
+
+
+def goal_manhattan_distance(packed: int) -> int:
+    """
+    Look a packed state up in the shared GoalManhattanTable
+    :param packed: int
+    :return: int
+    """
+    return GoalManhattanTable.get()(packed)
+
+
+def top_row_distance(packed: int) -> int:
+    """
+    Look a packed state up in the shared TopRowDatabase
+    :param packed: int
+    :return: int
+    """
+    return TopRowDatabase.get()(packed)
+
+
+class Heuristic:
+    """
+    Heuristic plug-in: a function registered by name that scores a packed state, behind a bounded
+    LRU memo so a state reached along several paths is only scored once. Functions cheaper than a memo lookup
+    are registered without one.
+    """
+
+    functions = {}
+    heuristics = {}
+
+    def __init__(self, function, memoize: bool = True, size: int = 65536):
+        """
+        Initialize the Heuristic object
+        :param function: callable taking a packed state, returning an admissible estimate
+        :param memoize: bool, keep scores in the memo
+        :param size: int, states kept in the memo
+        """
+        self.function = function
+        self.memoize = memoize
+        self.size = size
+        self.memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def register(cls, name: str, function, memoize: bool = True) -> None:
+        """
+        Register a heuristic function under a name, replacing any earlier one of the same name
+        :param name: str
+        :param function: callable taking a packed state, returning an admissible estimate
+        :param memoize: bool, put the memo in front of the function, off for functions cheaper than a lookup
+        """
+        cls.functions[name] = (function, memoize)
+        # A memo filled by the function being replaced would hand out its scores
+        cls.heuristics.pop(name, None)
+
+    @classmethod
+    def get(cls, name: str) -> 'Heuristic':
+        """
+        Get the shared Heuristic of a name, its memo persists from one solve to the next
+        :param name: str, a registered name
+        :return: Heuristic
+        """
+        if name not in cls.heuristics:
+            if name not in cls.functions:
+                raise ValueError(f'Unknown heuristic {name}')
+            cls.heuristics[name] = cls(*cls.functions[name])
+        return cls.heuristics[name]
+
+    def scorer(self):
+        """
+        Get the callable a search scores packed states with, the function itself when it is not memoized
+        :return: callable taking a packed state
+        """
+        return self if self.memoize else self.function
+
+    def __call__(self, packed: int) -> int:
+        """
+        Score a packed state, from the memo when it was scored before
+        :param packed: int
+        :return: int
+        """
+        memo = self.memo
+        score = memo.get(packed)
+        if score is not None:
+            memo.move_to_end(packed)
+            self.hits += 1
+            return score
+        self.misses += 1
+        score = self.function(packed)
+        memo[packed] = score
+        if len(memo) > self.size:
+            memo.popitem(last=False)
+        return score
+
+
+# The straight line distance of the assignment sums the grid distance of every tile, the same as Manhattan.
+# A table lookup costs less than the memo would
+Heuristic.register('manhattan', goal_manhattan_distance, memoize=False)
+Heuristic.register('straight_line', goal_manhattan_distance, memoize=False)
+Heuristic.register('toprow', top_row_distance, memoize=False)
 
 
 class Puzzle:
@@ -22,17 +645,26 @@ class Puzzle:
     Puzzle class to represent the 8-block puzzle
     """
 
+    # Registered Heuristic an AStar without a heuristic of its own scores this puzzle class with
+    heuristic_name = 'manhattan'
+    # Geometry and goal test IDDFS and LayerBFS search with
+    board = BOARD
+
     def __init__(self, puzzle_string: str):
         """
         Initialize the Puzzle object
         :param puzzle_string: str
         """
-        self.value = self.__load_puzzle(puzzle_string)
+        puzzle_string = self.__load_puzzle(puzzle_string)
+        self.packed = pack_puzzle(puzzle_string)
+        self.blank_index = puzzle_string.index('_')
         self.is_solvable = self.__is_solvable()
         if not self.is_solvable:
             raise ValueError('Puzzle is not solvable')
         self.is_solved = self.__is_solved()
-        self.moves = []
+        self.parent = None
+        self.move = None
+        self.depth = 0
 
     # ---- Helper Functions ----
 
@@ -50,11 +682,8 @@ class Puzzle:
         Check if the puzzle is solved
         :return: bool
         """
-        sum_of_top_row = 0
-        for i in range(3):
-            if self.value[i] != '_':
-                sum_of_top_row += int(self.value[i])
-        return sum_of_top_row == 11
+        packed = self.packed
+        return (packed & 0xF) + ((packed >> 4) & 0xF) + ((packed >> 8) & 0xF) == 11
 
     def __load_puzzle(self, puzzle_string: str) -> str:
         """
@@ -64,78 +693,84 @@ class Puzzle:
         """
         if ',' in puzzle_string:
             puzzle_string = puzzle_string.replace(',', '')
-        if len(puzzle_string) != 9:
+        if sorted(puzzle_string) != sorted('_12345678'):
             raise ValueError('Invalid input')
         return puzzle_string
 
     # ---- Use Functions ----
 
-    def execute_move(self, move: dict) -> 'Puzzle':
+    @classmethod
+    def from_packed(cls, packed: int, blank_index: int) -> 'Puzzle':
         """
-        Execute a move on the puzzle
-        :param move: dict
+        Build a puzzle straight from a packed state, skipping parsing and the solvability check
+        :param packed: int
+        :param blank_index: int
         :return: Puzzle
         """
-        new_value = list(self.value)
-        new_value[move['replacement_index']], new_value[self.value.index('_')] = new_value[self.value.index('_')], move[
-            'replacement_value']
-        new_puzzle = Puzzle(''.join(new_value))
-        new_puzzle.moves = self.moves + [move['move']]
-        new_puzzle.heuristic = move['heuristic']
-        return new_puzzle
+        puzzle = cls.__new__(cls)
+        puzzle.packed = packed
+        puzzle.blank_index = blank_index
+        puzzle.is_solvable = True
+        puzzle.is_solved = puzzle.__is_solved()
+        puzzle.parent = None
+        puzzle.move = None
+        puzzle.depth = 0
+        return puzzle
 
     @property
-    def available_moves(self) -> list:
+    def value(self) -> str:
         """
-        Get the available moves for the puzzle
+        Get the puzzle string decoded from the packed state
+        :return: str
+        """
+        return unpack_puzzle(self.packed)
+
+    def tile(self, index: int) -> int:
+        """
+        Get the tile at the given index, 0 for the blank
+        :param index: int
+        :return: int
+        """
+        return (self.packed >> (index << 2)) & 0xF
+
+    @property
+    def moves(self) -> list:
+        """
+        Get the moves that led to this puzzle, rebuilt by walking the parent pointers
         :return: list
         """
-        blank_index = self.value.index('_')
-        i, j = divmod(blank_index, 3)
         moves = []
-        if i < 2:  # Blank can move up
-            replacement_index = blank_index + 3
-            move = {'direction': 'D', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}U',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if i > 0:  # Blank can move down
-            replacement_index = blank_index - 3
-            move = {'direction': 'U', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}D',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if j < 2:  # Blank can move left
-            replacement_index = blank_index + 1
-            move = {'direction': 'R', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}L',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
-        if j > 0:  # Blank can move right
-            replacement_index = blank_index - 1
-            move = {'direction': 'L', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}R',
-                    'heuristic': self.__manhattan_distance(replacement_index)}
-            moves.append(move)
+        puzzle = self
+        while puzzle.parent is not None:
+            tile = puzzle.tile(puzzle.parent.blank_index)
+            moves.append(f'{tile}{MOVE_DIRECTIONS[puzzle.move]}')
+            puzzle = puzzle.parent
+        moves.reverse()
         return moves
 
-    def __manhattan_distance(self, index: int) -> int:
+    def execute_move(self, move: tuple) -> 'Puzzle':
         """
-        Calculate the Manhattan distance between the current index and the goal index
-        :param index: int
-        :return: int
+        Execute a move on the puzzle
+        :param move: tuple of (replacement index, move code) from MOVE_TABLE
+        :return: Puzzle
+        """
+        replacement_index, move_code = move
+        shift = replacement_index << 2
+        tile = (self.packed >> shift) & 0xF
+        packed = self.packed - (tile << shift) + (tile << (self.blank_index << 2))
+        new_puzzle = self.from_packed(packed, replacement_index)
+        new_puzzle.parent = self
+        new_puzzle.move = move_code
+        new_puzzle.depth = self.depth + 1
+        return new_puzzle
+
+    @property
+    def available_moves(self) -> tuple:
+        """
+        Get the available moves for the puzzle
+        :return: tuple of (replacement index, move code) pairs
         """
-        distance = 9
-        for goal in goals:
-            goal_index = goal.index(self.value[index])
-            goal_i, goal_j = divmod(goal_index, 3)
-            i, j = divmod(index, 3)
-            distance = min(distance, abs(goal_i - i) + abs(goal_j - j))
-        return distance
+        return MOVE_TABLE[self.blank_index]
 
     def __repr__(self) -> str:
         """
@@ -146,18 +781,24 @@ class Puzzle:
         return f'\n{" ".join(self.value[:3])}\n{" ".join(self.value[3:6])}\n{" ".join(self.value[6:])}\n'
 
 
-# Question 1.1.a
+# Question 2.1.a
 class DFS:
     """
     Depth First Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
 
-    def __init__(self):
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the DFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
         self.stack = deque()
         self.solution = []
-        self.node_expansion = 0
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def dfs(self, puzzle: Puzzle) -> bool:
         """
@@ -165,23 +806,37 @@ class DFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.stack.append(puzzle)
+        solved = False
 
         while self.stack:
             current_puzzle = self.stack.pop()
-            self.node_expansion += 1
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
+                solved = True
+                break
 
-            for move in current_puzzle.available_moves:
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
                     self.stack.append(new_puzzle)
+            if len(self.stack) > stats.max_frontier:
+                stats.max_frontier = len(self.stack)
 
-        return False
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -191,18 +846,24 @@ class DFS:
         return self.solution
 
 
-# Question 1.1.b
+# Question 2.1.b
 class BFS:
     """
     Breadth First Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
 
-    def __init__(self):
+    def __init__(self, stats: SearchStats = None, budget: Budget = None):
+        """
+        Initialize the BFS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
         self.queue = deque()
         self.solution = []
-        self.node_expansion = 0
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def bfs(self, puzzle: Puzzle) -> bool:
         """
@@ -210,20 +871,34 @@ class BFS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
         self.queue.append(puzzle)
+        solved = False
         while self.queue:
             current_puzzle = self.queue.popleft()
-            self.node_expansion += 1
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
                     self.queue.append(new_puzzle)
-        return False
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -233,18 +908,25 @@ class BFS:
         return self.solution
 
 
-# Question 1.1.c
+# Question 2.1.c
 class UCS:
     """
     Uniform Cost Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
+    def __init__(self, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the UCS object
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
         self.visited = set()
-        self.queue = deque()
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
-        self.node_expansion = 0
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def ucs(self, puzzle: Puzzle) -> bool:
         """
@@ -252,21 +934,34 @@ class UCS:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        self.visited.add(puzzle.packed)
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
-            self.node_expansion += 1
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves)))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    self.visited.add(new_puzzle.packed)
+                    heapq.heappush(self.queue, (new_puzzle.depth, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        stats.finish(self.solution, len(self.visited), len(self.visited) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -276,18 +971,28 @@ class UCS:
         return self.solution
 
 
-# Question 1.1.d
+# Question 2.1.d
 class AStar:
     """
     A* Search class to solve the 8-puzzle problem
     Written by: Luke Kerwin
     """
 
-    def __init__(self) -> None:
+    def __init__(self, heuristic=None, stats: SearchStats = None, budget: Budget = None) -> None:
+        """
+        Initialize the AStar object
+        :param heuristic: optional name of a registered Heuristic, or a callable scoring a packed state
+                          such as a TopRowDatabase; the puzzle class's heuristic_name is used when it is None
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
+        """
+        self.heuristic = heuristic
         self.visited = set()
-        self.queue = deque()
+        self.queue = []
+        self.counter = itertools.count()
         self.solution = []
-        self.node_expansion = 0
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
     def a_star(self, puzzle: Puzzle) -> bool:
         """
@@ -295,21 +1000,45 @@ class AStar:
         :param puzzle: Puzzle object
         :return: True if solved, False if not
         """
-        self.visited.add(puzzle.value)
-        self.queue.append(puzzle)
+        stats = self.stats
+        stats.start(self.budget)
+        heuristic = self.heuristic
+        if heuristic is None:
+            heuristic = puzzle.heuristic_name
+        if isinstance(heuristic, str):
+            heuristic = Heuristic.get(heuristic)
+        if isinstance(heuristic, Heuristic):
+            heuristic = heuristic.scorer()
+        heapq.heappush(self.queue, (0, next(self.counter), puzzle))
+        solved = False
         while self.queue:
-            current_puzzle = self.queue.popleft()
-            self.node_expansion += 1
+            _, _, current_puzzle = heapq.heappop(self.queue)
+            # A state can sit in the queue more than once, only its cheapest copy gets expanded
+            if current_puzzle.packed in self.visited:
+                continue
+            self.visited.add(current_puzzle.packed)
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report(len(self.visited)):
+                break
             if current_puzzle.is_solved:
-                self.solution = current_puzzle.moves
-                return True
-            for move in current_puzzle.available_moves:
+                solved = True
+                break
+            moves = current_puzzle.available_moves
+            stats.generated += len(moves)
+            for move in moves:
                 new_puzzle = current_puzzle.execute_move(move)
-                if new_puzzle.value not in self.visited:
-                    self.visited.add(new_puzzle.value)
-                    self.queue.append(new_puzzle)
-            self.queue = deque(sorted(self.queue, key=lambda x: len(x.moves) + x.heuristic))
-        return False
+                if new_puzzle.packed not in self.visited:
+                    priority = new_puzzle.depth + heuristic(new_puzzle.packed)
+                    heapq.heappush(self.queue, (priority, next(self.counter), new_puzzle))
+            if len(self.queue) > stats.max_frontier:
+                stats.max_frontier = len(self.queue)
+        stats.lap('search')
+        if solved:
+            self.solution = current_puzzle.moves
+            stats.lap('path')
+        # Every push drew one number from the counter, the root's included
+        stats.finish(self.solution, len(self.visited), next(self.counter) - 1)
+        return solved
 
     def get_solution(self) -> list:
         """
@@ -319,142 +1048,285 @@ class AStar:
         return self.solution
 
 
-# Question 1.1.e
-class SL_Puzzle:
+class TableSolver:
     """
-    Puzzle class to represent the 8-block puzzle that uses Straight Line Distance heuristic
+    Solver that reads optimal moves off a GoalDistanceTable instead of searching
     """
 
-    def __init__(self, puzzle_string: str):
+    def __init__(self, table: GoalDistanceTable, stats: SearchStats = None, budget: Budget = None) -> None:
         """
-        Initialize the Puzzle object
-        :param puzzle_string: str
+        Initialize the TableSolver object
+        :param table: GoalDistanceTable
+        :param stats: optional SearchStats, e.g. one with a callback
+        :param budget: optional Budget, the search gives up once it runs out
         """
-        self.value = self.__load_puzzle(puzzle_string)
-        self.is_solvable = self.__is_solvable()
-        if not self.is_solvable:
-            raise ValueError('Puzzle is not solvable')
-        self.is_solved = self.__is_solved()
-        self.moves = []
-
-    # ---- Helper Functions ----
-
-    def __is_solvable(self) -> bool:
-        inversions = 0
-        self.state = self.value.replace('_', '9')
-        for i in range(len(self.state)):
-            for j in range(i + 1, len(self.state)):
-                if self.state[i] != "9" and self.state[j] != "9" and self.state[i] > self.state[j]:
-                    inversions += 1
-        return inversions % 2 == 0
+        self.table = table
+        self.solution = []
+        self.stats = SearchStats() if stats is None else stats
+        self.budget = budget
 
-    def __is_solved(self) -> bool:
+    def solve(self, puzzle: Puzzle) -> bool:
         """
-        Check if the puzzle is solved
-        :return: bool
+        Step to any neighbour one move closer to a goal until a goal is reached
+        :param puzzle: Puzzle object
+        :return: True if solved, False if not
         """
-        sum_of_top_row = 0
-        for i in range(3):
-            if self.value[i] != '_':
-                sum_of_top_row += int(self.value[i])
-        return sum_of_top_row == 11
+        stats = self.stats
+        stats.start(self.budget)
+        distance = self.table(puzzle.packed)
+        solved = distance != UNREACHABLE
+        packed = puzzle.packed
+        blank_index = puzzle.blank_index
+        solution = []
+        while solved and distance:
+            stats.expanded += 1
+            if stats.expanded == stats.next_report and stats.report():
+                solved = False
+                break
+            for replacement_index, move_code in MOVE_TABLE[blank_index]:
+                stats.generated += 1
+                shift = replacement_index << 2
+                tile = (packed >> shift) & 0xF
+                child = packed - (tile << shift) + (tile << (blank_index << 2))
+                if self.table(child) == distance - 1:
+                    break
+            solution.append(f'{tile}{MOVE_DIRECTIONS[move_code]}')
+            packed = child
+            blank_index = replacement_index
+            distance -= 1
+        stats.lap('search')
+        if solved:
+            self.solution = solution
+        # One neighbour is taken per step, the others looked at are rejected
+        stats.finish(self.solution, 0, len(solution))
+        return solved
 
-    def __load_puzzle(self, puzzle_string: str) -> str:
+    def get_solution(self) -> list:
         """
-        Load the puzzle string and return it
-        :param puzzle_string: str
-        :return: str
+        Get the solution path
+        :return: list
         """
-        if ',' in puzzle_string:
-            puzzle_string = puzzle_string.replace(',', '')
-        if len(puzzle_string) != 9:
-            raise ValueError('Invalid input')
-        return puzzle_string
+        return self.solution
 
-    # ---- Use Functions ----
 
-    def execute_move(self, move: dict) -> 'SL_Puzzle':
-        """
-        Execute a move on the puzzle
-        :param move: dict
-        :return: SL_Puzzle
-        """
-        new_value = list(self.value)
-        new_value[move['replacement_index']], new_value[self.value.index('_')] = new_value[self.value.index('_')], move[
-            'replacement_value']
-        new_puzzle = SL_Puzzle(''.join(new_value))
-        new_puzzle.moves = self.moves + [move['move']]
-        new_puzzle.heuristic = move['heuristic']
-        return new_puzzle
+# Question 2.1.e
+class SL_Puzzle(Puzzle):
+    """
+    Puzzle class to represent the 8-block puzzle that uses Straight Line Distance heuristic
+    """
 
-    @property
-    def available_moves(self) -> list:
-        """
-        Get the available moves for the puzzle
-        :return: list
-        """
-        blank_index = self.value.index('_')
-        i, j = divmod(blank_index, 3)
-        moves = []
-        if i < 2:
-            replacement_index = blank_index + 3
-            move = {'direction': 'D', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}U',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if i > 0:
-            replacement_index = blank_index - 3
-            move = {'direction': 'U', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}D',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if j < 2:
-            replacement_index = blank_index + 1
-            move = {'direction': 'R', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}L',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        if j > 0:
-            replacement_index = blank_index - 1
-            move = {'direction': 'L', 'replacement_index': replacement_index,
-                    'replacement_value': self.value[replacement_index],
-                    'move': f'{self.value[replacement_index]}R',
-                    'heuristic': self.__straight_line_distance(replacement_index)}
-            moves.append(move)
-        return moves
+    heuristic_name = 'straight_line'
 
-    def __straight_line_distance(self, index: int) -> int:
-        """
-        Calculate the Straight Line Distance between the current index and the goal index
-        :param index: int
-        :return: int
-        """
-        distance = 9 * 9
-        for goal in goals:
-            dis = 0
-            for row in range(3):
-                for col in range(3):
-                    tile_index = row * 3 + col
-                    tile_value = self.value[tile_index]
-                    goal_tile_index = goal.index(tile_value)
-                    goal_tile_i, goal_tile_j = divmod(goal_tile_index, 3)
-                    dis += abs(goal_tile_i - row) + abs(goal_tile_j - col)
-            distance = min(distance, dis)
-        return distance
 
-    def __repr__(self) -> str:
-        """
-        String representation of the Puzzle object
-        :return: str
-        """
-        # Print the puzzle in a 3x3 grid
-        return f'\n{" ".join(self.value[:3])}\n{" ".join(self.value[3:6])}\n{" ".join(self.value[6:])}\n'
+# Goal part of a SolutionCache key
+GOAL = 'top row sums to 11'
+
+# Algorithms run by solve_puzzle, 'sl' is A* on an SL_Puzzle, 'toprow' is A* with the TopRowDatabase
+# and 'table' reads the answer off a GoalDistanceTable; 'layer' is LayerBFS, offered when NumPy is there
+ALGORITHMS = ('dfs', 'iddfs', 'bfs', 'ucs', 'astar', 'sl', 'toprow', 'table') + (('layer',) if np is not None else ())
+
+
+def load_puzzle(puzzle_string: str, algorithm: str = 'astar'):
+    """
+    Parse a puzzle string into the puzzle class the named algorithm runs on
+    :param puzzle_string: str
+    :param algorithm: str, one of ALGORITHMS
+    :return: Puzzle, or SL_Puzzle for 'sl'
+    """
+    if algorithm == 'sl':
+        return SL_Puzzle(puzzle_string)
+    return Puzzle(puzzle_string)
+
+
+def run_algorithm(puzzle, algorithm: str = 'astar', budget: Budget = None) -> tuple:
+    """
+    Run the named algorithm on a puzzle
+    :param puzzle: Puzzle or SL_Puzzle from load_puzzle
+    :param algorithm: str, one of ALGORITHMS
+    :param budget: optional Budget, the solver's stats tell whether it ran out
+    :return: tuple of (solver, whether it solved the puzzle)
+    """
+    if algorithm == 'dfs':
+        solver = DFS(budget=budget)
+        solved = solver.dfs(puzzle)
+    elif algorithm == 'iddfs':
+        solver = IDDFS(budget=budget)
+        solved = solver.iddfs(puzzle)
+    elif algorithm == 'bfs':
+        solver = BFS(budget=budget)
+        solved = solver.bfs(puzzle)
+    elif algorithm == 'layer':
+        solver = LayerBFS(budget=budget)
+        solved = solver.layer_bfs(puzzle)
+    elif algorithm == 'ucs':
+        solver = UCS(budget=budget)
+        solved = solver.ucs(puzzle)
+    elif algorithm == 'toprow':
+        solver = AStar('toprow', budget=budget)
+        solved = solver.a_star(puzzle)
+    elif algorithm == 'table':
+        solver = TableSolver(GoalDistanceTable.get(), budget=budget)
+        solved = solver.solve(puzzle)
+    else:
+        solver = AStar(budget=budget)
+        solved = solver.a_star(puzzle)
+    return solver, solved
+
+
+def solve_puzzle(puzzle_string: str, algorithm: str = 'astar', cache: SolutionCache = None,
+                 budget: Budget = None) -> tuple:
+    """
+    Solve one puzzle with the named algorithm
+    :param puzzle_string: str
+    :param algorithm: str, one of ALGORITHMS
+    :param cache: SolutionCache, answers repeated boards without searching
+    :param budget: optional Budget, BudgetExceeded is raised when the search runs out of it
+    :return: tuple of (solution list, number of expanded nodes)
+    """
+    puzzle = load_puzzle(puzzle_string, algorithm)
+    if cache is not None:
+        key = (puzzle.value, GOAL, algorithm)
+        moves = cache.lookup(key)
+        if moves is not None:
+            return moves, 0
+    solver, solved = run_algorithm(puzzle, algorithm, budget)
+    if solver.stats.exceeded is not None:
+        raise BudgetExceeded(solver.stats)
+    if cache is not None and solved:
+        cache.store(key, solver.get_solution())
+    return solver.get_solution(), solver.stats.expanded
+
+
+def prepare_tables(algorithm: str, table_path: str = None) -> None:
+    """
+    Build or load the shared tables an algorithm reads. Run before the worker processes fork,
+    they inherit the tables copy-on-write and only load what is still missing themselves.
+    :param algorithm: str, one of ALGORITHMS
+    :param table_path: str, file caching the GoalDistanceTable
+    """
+    if algorithm in ('astar', 'sl'):
+        GoalManhattanTable.get()
+    elif algorithm == 'toprow':
+        TopRowDatabase.get()
+    elif algorithm == 'table':
+        GoalDistanceTable.get(table_path)
+
+
+def solve_line(task: tuple) -> tuple:
+    """
+    Solve one batch line and format its tab separated result: line number, puzzle,
+    then 'ok', moves, move count, expanded nodes and seconds,
+    or 'error' and the reason for a line that is malformed or unsolvable,
+    or 'budget', the limit that ran out, expanded nodes and seconds for a search stopped by its Budget
+    :param task: tuple of (line number, line, algorithm, cache path, cache size, Budget or None),
+                 no cache when the size is 0
+    :return: tuple of the result and whether the SolutionCache had it, None when nothing was looked up;
+             None for a blank line
+    """
+    line_number, line, algorithm, cache_path, cache_size, budget = task
+    puzzle_string = line.strip()
+    if not puzzle_string:
+        return None
+    cache = SolutionCache.get(cache_path, cache_size) if cache_size else None
+    hits = cache.hits if cache is not None else 0
+    start = time.perf_counter()
+    try:
+        solution, expanded = solve_puzzle(puzzle_string, algorithm, cache, budget)
+    except ValueError as error:
+        return f'{line_number}\t{puzzle_string}\terror\t{error}', None
+    except BudgetExceeded as error:
+        seconds = time.perf_counter() - start
+        stats = error.stats
+        return f'{line_number}\t{puzzle_string}\tbudget\t{stats.exceeded}\t{stats.expanded}\t{seconds:.4f}', None
+    seconds = time.perf_counter() - start
+    cached = cache.hits > hits if cache is not None else None
+    moves = ','.join(solution)
+    return f'{line_number}\t{puzzle_string}\tok\t{moves}\t{len(solution)}\t{expanded}\t{seconds:.4f}', cached
+
+
+def run_batch(lines, output, algorithm: str = 'astar', workers: int = 1, chunk_size: int = 16,
+              ordered: bool = True, table_path: str = None, cache_path: str = None, cache_size: int = 0,
+              budget: Budget = None) -> tuple:
+    """
+    Solve puzzles line by line, writing each result line as soon as it is ready
+    :param lines: iterable of str, such as an open file or sys.stdin
+    :param output: writable text stream
+    :param algorithm: str, one of ALGORITHMS
+    :param workers: int, number of worker processes, 1 solves in this process
+    :param chunk_size: int, lines handed to a worker at a time
+    :param ordered: bool, write results in input order rather than as they finish
+    :param table_path: str, file caching the GoalDistanceTable
+    :param cache_path: str, sqlite file of the SolutionCache, memory only when None
+    :param cache_size: int, entries each process keeps in memory, 0 turns the cache off
+    :param budget: optional Budget applied to every search, lines that run out of it are reported as 'budget'
+    :return: tuple of SolutionCache hits and misses
+    """
+    prepare_tables(algorithm, table_path)
+    tasks = ((line_number, line, algorithm, cache_path, cache_size, budget)
+             for line_number, line in enumerate(lines, 1))
+    hits = 0
+    misses = 0
+    results = solve_lines(solve_line, tasks, workers, chunk_size, ordered, prepare_tables, (algorithm, table_path))
+    try:
+        for result in results:
+            if result is None:
+                continue
+            text, cached = result
+            output.write(text + '\n')
+            output.flush()
+            if cached is not None:
+                hits += cached
+                misses += not cached
+    finally:
+        # Lines solved in this process leave their last inserts uncommitted
+        SolutionCache.close_all()
+    return hits, misses
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--table', metavar='PATH',
+                        help='answer from a precomputed goal distance table, built and saved at PATH if missing')
+    parser.add_argument('--goals', metavar='PATH',
+                        help='cache the goal set at PATH instead of rebuilding it on every run')
+    parser.add_argument('--batch', metavar='PATH',
+                        help="solve every line of PATH, or of stdin when PATH is '-', instead of input.txt")
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='astar',
+                        help='algorithm used by --batch')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes used by --batch, 0 for one per core')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='lines handed to a worker at a time')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write batch results as they finish instead of in input order')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='keep batch solutions in a sqlite file at PATH and reuse them for repeated boards')
+    parser.add_argument('--cache-size', type=int, default=4096,
+                        help='solutions each process keeps in memory in front of --cache')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='give up on a batch line after SECONDS of searching')
+    parser.add_argument('--max-expanded', type=int, metavar='N',
+                        help='give up on a batch line after expanding N nodes')
+    parser.add_argument('--max-visited', type=int, metavar='N',
+                        help='give up on a batch line once N states were visited')
+    args = parser.parse_args()
+
+    if args.goals:
+        GoalSet.get(args.goals)
+
+    if args.batch:
+        workers = args.workers or os.cpu_count()
+        cache_size = args.cache_size if args.cache else 0
+        budget = None
+        if args.timeout is not None or args.max_expanded is not None or args.max_visited is not None:
+            budget = Budget(args.timeout, args.max_expanded, args.max_visited)
+        with open(args.batch, 'r') if args.batch != '-' else sys.stdin as f:
+            hits, misses = run_batch(f, sys.stdout, args.algorithm, workers, args.chunk_size, not args.unordered,
+                                     args.table, args.cache, cache_size, budget)
+        if args.cache:
+            print(f'cache: {hits} hits, {misses} misses', file=sys.stderr)
+        raise SystemExit
+
     # Assuming input.txt is in the same directory as this file
     with open('input.txt', 'r') as f:
         puzzle_string = f.readline().strip().replace(',', '')
@@ -462,6 +1334,12 @@ if __name__ == '__main__':
 
     puzzle = Puzzle(puzzle_string)
 
+    if args.table:
+        table_solver = TableSolver(GoalDistanceTable.get(args.table))
+        table_solver.solve(puzzle)
+        print(','.join(table_solver.get_solution()))
+        raise SystemExit
+
     # Question 2.2.a
     dfs = DFS()
     dfs.dfs(puzzle)
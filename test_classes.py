@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from benchmark import load_classes
+from search_common import SearchStats
+
+algorithms = load_classes()
+
+# A board 27 moves from the goal
+HARD_BOARD = '8672543_1'
+
+
+class FinishedStats(SearchStats):
+    """
+    SearchStats remembering whether the solver called finish
+    """
+
+    finished = False
+
+    def finish(self, solution: list, visited: int, pushed: int) -> None:
+        """
+        Note the call, then fill in the totals
+        :param solution: list
+        :param visited: int
+        :param pushed: int
+        """
+        self.finished = True
+        super().finish(solution, visited, pushed)
+
+
+def run_solver(name: str, stats: SearchStats, budget) -> tuple:
+    """
+    Run one of the classes package solvers on HARD_BOARD
+    :param name: str, one of algorithms.ALGORITHMS but 'layer'
+    :param stats: SearchStats
+    :param budget: Budget
+    :return: tuple of (solver, whether it solved the board)
+    """
+    puzzle = algorithms.load_puzzle(HARD_BOARD, name)
+    if name == 'dfs':
+        solver = algorithms.DFS(stats=stats, budget=budget)
+        return solver, solver.dfs(puzzle)
+    if name == 'iddfs':
+        solver = algorithms.IDDFS(stats=stats, budget=budget)
+        return solver, solver.iddfs(puzzle)
+    if name == 'bfs':
+        solver = algorithms.BFS(stats=stats, budget=budget)
+        return solver, solver.bfs(puzzle)
+    if name == 'bidirectional':
+        solver = algorithms.BidirectionalBFS(stats=stats, budget=budget)
+        return solver, solver.bidirectional_bfs(puzzle)
+    if name == 'ucs':
+        solver = algorithms.UCS(stats=stats, budget=budget)
+        return solver, solver.ucs(puzzle)
+    if name == 'idastar':
+        solver = algorithms.IDAStar(stats=stats, budget=budget)
+        return solver, solver.ida_star(puzzle)
+    if name == 'table':
+        solver = algorithms.TableSolver(algorithms.prepare_tables('table'), stats=stats, budget=budget)
+        return solver, solver.solve(puzzle)
+    heuristic = algorithms.prepare_tables('pdb') if name == 'pdb' else None
+    solver = algorithms.AStar(heuristic, stats=stats, budget=budget)
+    return solver, solver.a_star(puzzle)
+
+
+@pytest.mark.parametrize('name', [algorithm for algorithm in algorithms.ALGORITHMS if algorithm != 'layer'])
+def test_budget_stops_every_solver(name):
+    stats = FinishedStats()
+    solver, solved = run_solver(name, stats, algorithms.Budget(max_expanded=5))
+    # The stopped search has expanded exactly its budget, found nothing and still filled in its totals
+    assert not solved
+    assert stats.exceeded == 'expanded'
+    assert stats.expanded == 5
+    assert stats.finished
+    assert stats.depth == 0
+    assert solver.get_solution() == []
+
+
+def test_table_and_pattern_database_are_optimal():
+    rng = random.Random(0)
+    for _ in range(8):
+        puzzle = algorithms.load_puzzle('_12345678')
+        for _ in range(rng.randrange(10, 40)):
+            puzzle = puzzle.execute_move(rng.choice(puzzle.available_moves))
+        board = puzzle.value
+        solver, _ = algorithms.run_algorithm(algorithms.load_puzzle(board), 'astar')
+        optimal = len(solver.get_solution())
+        for algorithm in ('idastar', 'bidirectional', 'pdb', 'table'):
+            solver, solved = algorithms.run_algorithm(algorithms.load_puzzle(board), algorithm)
+            assert solved
+            assert len(solver.get_solution()) == optimal
+
+
+def test_pattern_database_round_trip(tmp_path):
+    path = str(tmp_path / 'pdb.bin')
+    database = algorithms.PatternDatabase.build()
+    database.save(path)
+    loaded = algorithms.PatternDatabase.load(path)
+    assert (loaded.width, loaded.patterns) == (database.width, database.patterns)
+    assert [bytes(table) for table in loaded.tables] == [bytes(table) for table in database.tables]
+    opened = algorithms.PatternDatabase.open(path, 3)
+    packed = algorithms.load_puzzle(HARD_BOARD).packed
+    assert opened(packed) == loaded(packed) == database(packed)
+    # A file holding another width is refused rather than read as the wrong board
+    with pytest.raises(ValueError):
+        algorithms.PatternDatabase.open(path, 4)
+
+
+def test_distance_table_round_trip(tmp_path):
+    path = str(tmp_path / 'table.bin')
+    table = algorithms.prepare_tables('table')
+    table.save(path)
+    loaded = algorithms.DistanceTable.load(path)
+    assert bytes(loaded.distances) == bytes(table.distances)
+    assert bytes(algorithms.DistanceTable.open(path).distances) == bytes(table.distances)
+    assert loaded(algorithms.load_puzzle(HARD_BOARD).packed) == 27
+    with pytest.raises(ValueError):
+        algorithms.PatternDatabase.load(path)
@@ -0,0 +1,126 @@
+import io
+
+import pytest
+
+from solution_q1 import (AStar, BFS, DFS, IDDFS, UCS, Budget, BudgetExceeded, LayerBFS, Puzzle, SearchStats,
+                         SolutionCache, np, run_batch, solve_puzzle)
+
+# Solvers with the method that runs them, each takes stats and budget keywords
+SOLVERS = ((DFS, 'dfs'), (IDDFS, 'iddfs'), (BFS, 'bfs'), (UCS, 'ucs'), (AStar, 'a_star'))
+
+
+class FinishedStats(SearchStats):
+    """
+    SearchStats remembering whether the solver called finish
+    """
+
+    finished = False
+
+    def finish(self, solution: list, visited: int, pushed: int) -> None:
+        """
+        Note the call, then fill in the totals
+        :param solution: list
+        :param visited: int
+        :param pushed: int
+        """
+        self.finished = True
+        super().finish(solution, visited, pushed)
+
+
+def mirror_string(puzzle_string: str) -> str:
+    """
+    Get the puzzle string of a board's diagonal mirror
+    :param puzzle_string: str
+    :return: str
+    """
+    puzzle = Puzzle(puzzle_string)
+    return puzzle.board.format(puzzle.board.mirror(puzzle.packed))
+
+
+def replay(puzzle_string: str, moves: list) -> Puzzle:
+    """
+    Play a list of moves from a board, each one has to be legal where it is played
+    :param puzzle_string: str
+    :param moves: list
+    :return: Puzzle reached after the last move
+    """
+    puzzle = Puzzle(puzzle_string)
+    for move in moves:
+        children = [puzzle.execute_move(available) for available in puzzle.available_moves]
+        puzzle = next(child for child in children if child.moves[-1] == move)
+    return puzzle
+
+
+def test_dfs_cached_matches_uncached():
+    board = '3124_5678'
+    mirror = mirror_string(board)
+    assert mirror != board
+    uncached = {puzzle_string: solve_puzzle(puzzle_string, 'dfs')[0] for puzzle_string in (board, mirror)}
+    # Whichever of the pair is solved first, each board gets back what its own search returns
+    for order in ((board, mirror), (mirror, board)):
+        cache = SolutionCache(size=16)
+        for puzzle_string in order + order:
+            assert solve_puzzle(puzzle_string, 'dfs', cache)[0] == uncached[puzzle_string]
+
+
+def test_optimal_algorithms_share_the_mirror_entry():
+    board = '3124_5678'
+    mirror = mirror_string(board)
+    cache = SolutionCache(size=16)
+    moves, _ = solve_puzzle(mirror, 'astar', cache)
+    cached_moves, expanded = solve_puzzle(board, 'astar', cache)
+    # The board is answered from its mirror's entry without searching, with a solution of the same length
+    assert expanded == 0
+    assert len(cached_moves) == len(moves) == len(solve_puzzle(board, 'astar')[0])
+    # The mirrored moves solve the board they were handed back for
+    assert replay(board, cached_moves).packed == Puzzle(board).board.goal
+
+
+@pytest.mark.parametrize('solver_class, method', SOLVERS)
+def test_budget_stops_every_solver(solver_class, method):
+    stats = FinishedStats()
+    solver = solver_class(stats=stats, budget=Budget(max_expanded=5))
+    assert not getattr(solver, method)(Puzzle('8672543_1'))
+    # The stopped search has expanded exactly its budget, found nothing and still filled in its totals
+    assert stats.exceeded == 'expanded'
+    assert stats.expanded == 5
+    assert stats.finished
+    assert stats.depth == 0
+    assert solver.get_solution() == []
+
+
+@pytest.mark.skipif(np is None, reason='LayerBFS needs numpy')
+def test_budget_stops_layer_bfs():
+    stats = FinishedStats()
+    solver = LayerBFS(stats=stats, budget=Budget(max_expanded=5))
+    assert not solver.layer_bfs(Puzzle('8672543_1'))
+    # A whole layer is expanded or none of it, so the layer that would go past the budget is left out
+    assert stats.exceeded == 'expanded'
+    assert stats.expanded <= 5
+    assert stats.finished
+    assert solver.get_solution() == []
+
+
+def test_solve_puzzle_raises_when_the_budget_runs_out():
+    with pytest.raises(BudgetExceeded) as error:
+        solve_puzzle('8672543_1', 'astar', budget=Budget(max_expanded=5))
+    assert error.value.stats.exceeded == 'expanded'
+
+
+@pytest.mark.parametrize('ordered', (True, False))
+def test_batch_on_workers_keeps_every_line(ordered):
+    lines = ['3124_5678\n', 'not a board\n', '\n', '_12345678\n', '1_2345678\n', '2134_5678\n', '8672543_1\n']
+    output = io.StringIO()
+    run_batch(lines, output, 'astar', workers=2, chunk_size=2, ordered=ordered)
+    results = [line.split('\t') for line in output.getvalue().splitlines()]
+    numbers = [int(result[0]) for result in results]
+    # The blank line gets no result, the others come back in input order when ordered
+    assert numbers == [1, 2, 4, 5, 6, 7] if ordered else sorted(numbers) == [1, 2, 4, 5, 6, 7]
+    results = {int(result[0]): result for result in results}
+    assert results[2][2] == 'error'
+    # 2134_5678 has the wrong parity and cannot be solved
+    assert results[6][2] == 'error'
+    for number in (1, 4, 5, 7):
+        assert results[number][2] == 'ok'
+        moves = results[number][3].split(',') if results[number][3] else []
+        assert replay(lines[number - 1].strip(), moves).is_solved
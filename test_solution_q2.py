@@ -0,0 +1,157 @@
+import io
+import random
+
+import pytest
+
+from solution_q2 import (AStar, BFS, DFS, IDDFS, UCS, Budget, GoalDistanceTable, GoalSet, LayerBFS, Puzzle,
+                         SearchStats, SL_Puzzle, TableSolver, np, pack_puzzle, run_batch, solve_puzzle)
+
+# A board 10 moves from the nearest goal, the most any board needs
+HARD_BOARD = '527138_64'
+
+
+class FinishedStats(SearchStats):
+    """
+    SearchStats remembering whether the solver called finish
+    """
+
+    finished = False
+
+    def finish(self, solution: list, visited: int, pushed: int) -> None:
+        """
+        Note the call, then fill in the totals
+        :param solution: list
+        :param visited: int
+        :param pushed: int
+        """
+        self.finished = True
+        super().finish(solution, visited, pushed)
+
+
+def run_solver(name: str, stats: SearchStats, budget: Budget) -> tuple:
+    """
+    Run one of the solvers on HARD_BOARD
+    :param name: str
+    :param stats: SearchStats
+    :param budget: Budget
+    :return: tuple of (solver, whether it solved the board)
+    """
+    puzzle = Puzzle(HARD_BOARD)
+    if name == 'dfs':
+        solver = DFS(stats=stats, budget=budget)
+        return solver, solver.dfs(puzzle)
+    if name == 'iddfs':
+        solver = IDDFS(stats=stats, budget=budget)
+        return solver, solver.iddfs(puzzle)
+    if name == 'bfs':
+        solver = BFS(stats=stats, budget=budget)
+        return solver, solver.bfs(puzzle)
+    if name == 'ucs':
+        solver = UCS(stats=stats, budget=budget)
+        return solver, solver.ucs(puzzle)
+    if name == 'table':
+        solver = TableSolver(GoalDistanceTable.get(), stats=stats, budget=budget)
+        return solver, solver.solve(puzzle)
+    if name == 'sl':
+        solver = AStar(stats=stats, budget=budget)
+        return solver, solver.a_star(SL_Puzzle(HARD_BOARD))
+    solver = AStar('toprow' if name == 'toprow' else None, stats=stats, budget=budget)
+    return solver, solver.a_star(puzzle)
+
+
+def replay(puzzle_string: str, moves: list) -> Puzzle:
+    """
+    Play a list of moves from a board, each one has to be legal where it is played
+    :param puzzle_string: str
+    :param moves: list
+    :return: Puzzle reached after the last move
+    """
+    puzzle = Puzzle(puzzle_string)
+    for move in moves:
+        children = [puzzle.execute_move(available) for available in puzzle.available_moves]
+        puzzle = next(child for child in children if child.moves[-1] == move)
+    return puzzle
+
+
+@pytest.mark.parametrize('name', ('dfs', 'iddfs', 'bfs', 'ucs', 'astar', 'sl', 'toprow', 'table'))
+def test_budget_stops_every_solver(name):
+    stats = FinishedStats()
+    solver, solved = run_solver(name, stats, Budget(max_expanded=5))
+    # The stopped search has expanded exactly its budget, found nothing and still filled in its totals
+    assert not solved
+    assert stats.exceeded == 'expanded'
+    assert stats.expanded == 5
+    assert stats.finished
+    assert stats.depth == 0
+    assert solver.get_solution() == []
+
+
+@pytest.mark.skipif(np is None, reason='LayerBFS needs numpy')
+def test_budget_stops_layer_bfs():
+    stats = FinishedStats()
+    solver = LayerBFS(stats=stats, budget=Budget(max_expanded=5))
+    assert not solver.layer_bfs(Puzzle(HARD_BOARD))
+    # A whole layer is expanded or none of it, so the layer that would go past the budget is left out
+    assert stats.exceeded == 'expanded'
+    assert stats.expanded <= 5
+    assert stats.finished
+    assert solver.get_solution() == []
+
+
+def test_table_and_heuristics_are_optimal():
+    rng = random.Random(0)
+    boards = []
+    while len(boards) < 12:
+        tiles = list('_12345678')
+        rng.shuffle(tiles)
+        board = ''.join(tiles)
+        try:
+            Puzzle(board)
+        except ValueError:
+            continue
+        boards.append(board)
+    for board in boards:
+        optimal = len(solve_puzzle(board, 'bfs')[0])
+        for algorithm in ('astar', 'sl', 'toprow', 'table'):
+            moves = solve_puzzle(board, algorithm)[0]
+            assert len(moves) == optimal
+            assert replay(board, moves).is_solved
+
+
+def test_goal_set_round_trip(tmp_path):
+    path = str(tmp_path / 'goals.bin')
+    goal_set = GoalSet.build()
+    goal_set.save(path)
+    loaded = GoalSet.load(path)
+    assert bytes(loaded.bits) == bytes(goal_set.bits)
+    assert len(loaded) == len(goal_set)
+    assert bytes(GoalSet.open(path).bits) == bytes(goal_set.bits)
+    # A missing file is built and saved by open
+    opened = GoalSet.open(str(tmp_path / 'missing.bin'))
+    assert bytes(opened.bits) == bytes(goal_set.bits)
+    assert pack_puzzle('2361_4578') in loaded
+    assert pack_puzzle(HARD_BOARD) not in loaded
+
+
+def test_goal_distance_table_round_trip(tmp_path):
+    path = str(tmp_path / 'distances.bin')
+    table = GoalDistanceTable.get()
+    table.save(path)
+    loaded = GoalDistanceTable.load(path)
+    assert bytes(loaded.distances) == bytes(table.distances)
+    assert bytes(GoalDistanceTable.open(path).distances) == bytes(table.distances)
+    assert loaded(Puzzle(HARD_BOARD).packed) == 10
+    with pytest.raises(ValueError):
+        GoalSet.load(path)
+
+
+def test_batch_on_workers_keeps_every_line():
+    lines = ['3124_5678\n', 'not a board\n', '\n', HARD_BOARD + '\n', '2134_5678\n', '8672543_1\n']
+    output = io.StringIO()
+    run_batch(lines, output, 'astar', workers=2, chunk_size=2, ordered=True)
+    results = [line.split('\t') for line in output.getvalue().splitlines()]
+    # The blank line gets no result, the others come back in input order
+    assert [int(result[0]) for result in results] == [1, 2, 4, 5, 6]
+    statuses = [result[2] for result in results]
+    assert statuses == ['ok', 'error', 'ok', 'error', 'ok']
+    assert int(results[2][4]) == 10